@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: analytics.py
+# Description: Vectorized return / risk analytics for the YFinance app
+#
+# All metrics are computed for every symbol at once on a (dates x symbols)
+# float64 price block with NumPy array operations - no per-ticker loop.
+# Missing prices (NaN) before a symbol's first close are ignored, gaps after
+# it are forward filled.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from close_matrix import ffill_block
+
+
+TRADING_DAYS = 252  # sessions per year, for annualizing
+VOL_WINDOW = 21     # sessions, rolling volatility window (1M)
+
+
+#%% Functions - Returns
+
+def daily_returns(prices):
+    """ Fn to compute simple daily returns of a (dates x symbols) block
+        Return: np.ndarray with one row fewer than prices
+    """
+    return prices[1:] / prices[:-1] - 1
+
+
+def log_returns(prices):
+    """ Fn to compute daily log returns of a (dates x symbols) block
+        Return: np.ndarray with one row fewer than prices
+    """
+    return np.diff(np.log(prices), axis=0)
+
+
+#%% Functions - Risk
+
+def rolling_volatility(log_ret, window=VOL_WINDOW):
+    """ Fn to compute annualized rolling volatility via running sums
+        (O(dates) per symbol whatever the window, NaNs are skipped)
+        Return: np.ndarray of shape (len(log_ret) - window + 1, symbols)
+    """
+    valid = ~np.isnan(log_ret)
+    x = np.where(valid, log_ret, 0.0)
+
+    zeros = np.zeros((1, log_ret.shape[1]))
+    s0 = np.vstack([zeros, np.cumsum(valid, axis=0)])
+    s1 = np.vstack([zeros, np.cumsum(x, axis=0)])
+    s2 = np.vstack([zeros, np.cumsum(x * x, axis=0)])
+
+    n = s0[window:] - s0[:-window]
+    sum1 = s1[window:] - s1[:-window]
+    sum2 = s2[window:] - s2[:-window]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var = (sum2 - sum1 * sum1 / n) / (n - 1)
+
+    return np.sqrt(np.clip(var, 0, None)) * np.sqrt(TRADING_DAYS)
+
+
+def max_drawdown(prices):
+    """ Fn to compute the maximum drawdown of every symbol
+        Return: np.ndarray (<= 0) per symbol
+    """
+    running_max = np.fmax.accumulate(prices, axis=0)
+
+    return np.nanmin(prices / running_max - 1, axis=0)
+
+
+#%% Functions - Metrics table
+
+def compute_metrics(closing_df, risk_free=0.0, window=VOL_WINDOW):
+    """ Fn to compute the metrics table for every column of closing_df
+        Return: df indexed by symbol: last, return, cagr, volatility,
+        rolling volatility (latest window), max drawdown, sharpe
+    """
+    return block_metrics(closing_df.to_numpy(dtype='float64'),
+                         closing_df.columns, risk_free, window)
+
+
+def block_metrics(values, symbols, risk_free=0.0, window=VOL_WINDOW):
+    """ Fn to compute the metrics table straight from a (dates x symbols)
+        price array, e.g. close_matrix.CloseMatrix.values
+        Return: df indexed by symbol (see compute_metrics)
+    """
+    metric_cols = ['last', 'return', 'cagr', 'volatility',
+                   'vol_{}d'.format(window), 'max_drawdown', 'sharpe']
+    if len(values) < 2:
+        return pd.DataFrame(np.nan, index=pd.Index(symbols),
+                            columns=metric_cols)
+
+    prices = ffill_block(np.asarray(values, dtype='float64'))
+    n_dates, n_symbols = prices.shape
+    cols = np.arange(n_symbols)
+
+    # first valid close per symbol (symbols may start late in the window)
+    first_idx = np.argmax(~np.isnan(prices), axis=0)
+    first = prices[first_idx, cols]
+    last = prices[-1]
+
+    log_ret = log_returns(prices)
+    years = (n_dates - 1 - first_idx) / TRADING_DAYS
+
+    # symbols without any close give NaN metrics, not warnings
+    with np.errstate(invalid='ignore', divide='ignore'), \
+            warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+
+        total_return = last / first - 1
+        cagr = np.where(years > 0, (last / first) ** (1 / years) - 1, np.nan)
+
+        ann_mean = np.nanmean(log_ret, axis=0) * TRADING_DAYS
+        volatility = np.nanstd(log_ret, axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+        sharpe = (ann_mean - risk_free) / volatility
+        drawdown = max_drawdown(prices)
+
+        if len(log_ret) >= window:
+            rolling_vol = rolling_volatility(log_ret, window)[-1]
+        else:
+            rolling_vol = np.full(n_symbols, np.nan)
+
+    values = [last, total_return, cagr, volatility, rolling_vol, drawdown,
+              sharpe]
+
+    return pd.DataFrame(dict(zip(metric_cols, values)),
+                        index=pd.Index(symbols))
@@ -15,21 +15,91 @@
 import altair as alt
 from datetime import datetime as dt
 from datetime import timedelta
+import os
+import pandas as pd
 import streamlit as st
 from streamlit_gsheets import GSheetsConnection
-import yfinance as yf
+
+import analytics
+import chart_cache
+import circuit_breaker
+import close_matrix
+import downsample
+import frames
+import gsheet_writer
+import indicators
+import loader_cache
+import matrix_store
+import prewarm
+import price_store
+import providers
+import range_index
+from singleflight import flight
+import trading_calendar
 
 
 #%% Part 1.2: Parameters & Additional Setup
 
-SPREADSHEET_URL = st.secrets.connections.gsheets_yfinance.spreadsheet
-WORKSHEET_NAME= st.secrets.connections.gsheets_yfinance.worksheet
+# Data providers: 'yfinance' | 'gsheets' | 'local' | 'synthetic'
+# e.g. YF_PRICE_PROVIDER=local YF_HISTORY_PROVIDER=local runs fully offline
+PRICE_PROVIDER = os.environ.get('YF_PRICE_PROVIDER', 'yfinance')
+HISTORY_PROVIDER = os.environ.get('YF_HISTORY_PROVIDER', 'gsheets')
+PROVIDER_LATENCY = float(os.environ.get('YF_PROVIDER_LATENCY', 0)) # seconds
+
+# yfinance fetch mode: 'bulk' (one yf.download) | 'per_ticker' (asyncio engine)
+YF_FETCH_MODE = os.environ.get('YF_FETCH_MODE', 'bulk')
+YF_FETCH_CONCURRENCY = int(os.environ.get('YF_FETCH_CONCURRENCY', 8))
+# bulk mode: universes above YF_CHUNK_SIZE tickers download in parallel batches
+YF_CHUNK_SIZE = int(os.environ.get('YF_CHUNK_SIZE', 100))
+YF_CHUNK_WORKERS = int(os.environ.get('YF_CHUNK_WORKERS', 4))
+
+# refresh cached data on a background thread shortly after each market close
+PREWARM_ENABLED = os.environ.get('YF_PREWARM', '1') == '1'
+
+# optional worksheet mirroring the daily closes (appended by a write-behind
+# queue on a background thread, never inside the page render)
+CLOSING_WORKSHEET_NAME = os.environ.get('YF_CLOSING_WORKSHEET')
+
+if HISTORY_PROVIDER == 'gsheets' or PRICE_PROVIDER == 'gsheets' or \
+        CLOSING_WORKSHEET_NAME:
+    SPREADSHEET_URL = st.secrets.connections.gsheets_yfinance.spreadsheet
+    WORKSHEET_NAME= st.secrets.connections.gsheets_yfinance.worksheet
+else:
+    SPREADSHEET_URL = WORKSHEET_NAME = None
 
 TICKERS = ['AAPL', 'AMZN', 'GOOG', 'MSFT', 'NFLX', 'TSLA']
 SYMBOL_INPUT_DEFAULT = 0
 
+DATA_SESSIONS = 252 # trading sessions of closing data to fetch (1Y)
+
 PERIOD_INPUT_DEFAULT = '3M'
 
+CHART_WIDTH = 800 # px, series are downsampled (LTTB) to about 1 point per px
+
+# technical indicators (sidebar options -> indicators.py columns)
+INDICATOR_OPTIONS = {'SMA 20': ['sma'],
+                     'EMA 20': ['ema'],
+                     'Bollinger 20,2': ['bb_upper', 'bb_lower'],
+                     'RSI 14': ['rsi'],
+                     'MACD 12,26,9': ['macd', 'macd_signal']}
+PANEL_INDICATORS = ['rsi', 'macd', 'macd_signal'] # own panel, not on price axis
+
+# historical chart: aggregate server-side with VegaFusion (optional package)
+HISTORY_SERVER_SIDE = os.environ.get('YF_VEGAFUSION', '0') == '1'
+
+# memory-mapped close matrices shared read-only by all server processes
+MATRIX_STORE_DIR = os.environ.get('YF_MATRIX_STORE', matrix_store.STORE_DIR)
+
+# memory budget of the cached data loaders (LRU eviction above it)
+LOADER_CACHE_MB = int(os.environ.get('YF_CACHE_MB', 256))
+loader_cache.loaders.resize(LOADER_CACHE_MB * 2**20)
+
+# disk tier of the loader cache, survives restarts ('' disables it)
+DISK_CACHE_PATH = os.environ.get('YF_DISK_CACHE', './data/loader_cache.sqlite')
+DISK_CACHE_MB = int(os.environ.get('YF_DISK_CACHE_MB', 1024))
+if DISK_CACHE_PATH: # warm-loads the memory tier on the first run only
+    loader_cache.loaders.attach_disk(DISK_CACHE_PATH, DISK_CACHE_MB * 2**20)
+
 #%% Part 1.3: Date Setup
 
 
@@ -48,6 +118,13 @@ now_year = now_date_minus1D.year
 start_date = now_date_minus1Y
 end_date = now_date_minus1D # end_date is yesterday to get yesterday's close
 
+# Cache keys follow the exchange calendar, not the wall clock: they only
+# change once a new session has closed, so cached data stays valid over
+# weekends / holidays and rolls over shortly after the next close.
+last_session = trading_calendar.last_completed_session()
+data_start_date = trading_calendar.sessions_back(last_session, DATA_SESSIONS)
+data_end_date = last_session + timedelta(days=1) # exclusive end for fetches
+
 
 #%% Part 2.1 : Page Setup (st.set_page_config - must be called as the first
 # Streamlit command in your script)
@@ -70,11 +147,43 @@ st.set_page_config(
 st.title(':dollar: YFinance Stocks Dashboard :pound:')
 
 
-# %% Part 2.2 : GSheetsConnection : gsheets_yfinance
+# %% Part 2.2 : GSheetsConnection : gsheets_yfinance & Data Providers
+
+def build_provider(provider_name1, history1=False):
+    """ Function to construct the configured price provider
+        history1: the provider serves the historical prices (Part 6)
+        Return: providers.PriceProvider
+    """
+    if provider_name1 == 'gsheets':
+        # Create a connection object with st.connection()
+        # st.connection() handles secrets retrieval, setup, query caching and retries.
+        conn_yf = st.connection("gsheets_yfinance", type = GSheetsConnection)
+        provider1 = providers.get_provider('gsheets', history=history1,
+                                           conn=conn_yf,
+                                           spreadsheet=SPREADSHEET_URL,
+                                           worksheet=WORKSHEET_NAME,
+                                           latency=PROVIDER_LATENCY)
+
+    elif provider_name1 == 'yfinance':
+        provider1 = providers.get_provider('yfinance', history=history1,
+                                           per_ticker=(YF_FETCH_MODE == 'per_ticker'),
+                                           max_concurrency=YF_FETCH_CONCURRENCY,
+                                           chunk_size=YF_CHUNK_SIZE,
+                                           chunk_workers=YF_CHUNK_WORKERS)
+
+    else:
+        provider1 = providers.get_provider(provider_name1, history=history1,
+                                           latency=PROVIDER_LATENCY)
+
+    # timeout per upstream request (batch / ticker / sheet read); retries and
+    # failure counting happen once per logical call in breaker.call
+    provider1.request_fn = circuit_breaker.get_breaker(provider_name1).request
+
+    return provider1
+
 
-# Create a connection object with st.connection()
-# st.connection() handles secrets retrieval, setup, query caching and retries.
-conn_yf = st.connection("gsheets_yfinance", type = GSheetsConnection)
+price_provider = build_provider(PRICE_PROVIDER)
+history_provider = build_provider(HISTORY_PROVIDER, history1=True)
 
 
 #%% Part 2.3 Session State
@@ -98,44 +207,287 @@ def update_counter():
     return None
 
 
-@st.cache_data
-def gsheet2df(spreadsheet_name, wsheet_name):
-    """ Function to fetch a google sheet and convert it into a df """
+@loader_cache.loaders.cached
+def gsheet2df(spreadsheet_name, wsheet_name, provider_name, data_version):
+    """ Function to fetch a google sheet and convert it into a df
+        (served by the configured history provider: provider_name)
+        data_version: last completed session, expires the entry after a close
+    """
     # read from private google sheets worksheet
-    df1 = conn_yf.read(spreadsheet=spreadsheet_name,
-                       worksheet=wsheet_name)
+    # (concurrent sessions missing the cache share one in-flight read,
+    #  guarded by a timeout / retry / circuit breaker)
+    breaker = circuit_breaker.get_breaker(provider_name)
+    df1 = flight.do(('gsheet2df', provider_name, spreadsheet_name, wsheet_name),
+                    breaker.call, history_provider.read_history)
     # df1.set_index('Date', drop=True, inplace=True)
 
+    circuit_breaker.remember('gsheet2df', df1)
+
     return df1
 
 
-@st.cache_data
-def new_closing_feed2(start_date1, end_date1, tickers1):
+def fetch_closing_prices(start_date1, end_date1, tickers1):
+    """ Function to fetch closing prices from the configured price provider
+        Only dates missing from the local price store are downloaded.
+        Return: closing prices df (DatetimeIndex x tickers)
+    """
+    breaker = circuit_breaker.get_breaker(PRICE_PROVIDER)
+
+    def fetch_fn(tickers2, start_date2, end_date2):
+        return breaker.call(price_provider.fetch_closing,
+                            tickers2, start_date2, end_date2)
+
+    if price_provider.persistent:
+        closing_df = price_store.update_store(tickers1, start_date1, end_date1,
+                                              fetch_fn=fetch_fn)
+    else:
+        closing_df = fetch_fn(tickers1, start_date1, end_date1)
+
+    if closing_df is None or closing_df.empty:
+        raise ValueError('{} returned no closing prices'.format(PRICE_PROVIDER))
+
+    return closing_df
+
+
+@loader_cache.loaders.cached
+def melt_historical(_nasdaq_df1, provider_name, data_version):
+    """ Function to unpivot the historical prices into a compact long df
+        (built once per data_version; the df itself is not hashed)
+        Return: df_melt (df) with columns date, symbol (category), price (float32)
+    """
+    return frames.melt_compact(_nasdaq_df1.reset_index(), date_col='Date')
+
+
+def open_closing_worksheet(spreadsheet_name, wsheet_name):
+    """ Function to authorize a gspread client and open the closing worksheet
+        (called once by the write-behind worker)
+    """
+    import gspread
+
+    cred_dict1 = {key: value for key, value in
+                  st.secrets.connections.gsheets_yfinance.items()
+                  if key not in ('spreadsheet', 'worksheet')}
+    client = gspread.service_account_from_dict(cred_dict1)
+
+    return client.open_by_url(spreadsheet_name).worksheet(wsheet_name)
+
+
+@st.cache_resource
+def get_gsheet_writer(spreadsheet_name, wsheet_name):
+    """ Function to start one write-behind queue per server process
+        Return: gsheet_writer.GSheetWriteBehind
+    """
+    return gsheet_writer.GSheetWriteBehind(
+        lambda: open_closing_worksheet(spreadsheet_name, wsheet_name))
+
+
+@loader_cache.loaders.cached
+def new_closing_feed2(start_date1, end_date1, tickers1, provider_name):
     """ Function to fetch closing price data from the YFinance feed
+        (or the configured price provider: provider_name).
         Return: closing_df (df)
     """
-    yf_df = yf.download(
-    	tickers=tickers1,
-    	threads=True,      # built-in multithreading
-        start=start_date1,
-        end=end_date1,
-        auto_adjust=True)  # auto-adjusted prices
-
-    # filter for column level Price = 'Close'
-    closing_df = yf_df.xs('Close', axis=1, level='Price')
+    # concurrent sessions missing the cache block on one in-flight download
+    fetch_key = ('new_closing_feed2', provider_name, tuple(tickers1),
+                 start_date1, end_date1)
+    closing_df = flight.do(fetch_key, fetch_closing_prices,
+                           start_date1, end_date1, tickers1)
+
     # rounding of decimal values to 2 places
     closing_df = closing_df.round(decimals = 2)
-    # convert index from data type: datetime.DatetimeIndex to datetime.date
-    closing_df.index = closing_df.index.date
+    # keep a sorted datetime64 index: periods are cut by binary search
+    closing_df = frames.to_date_index(closing_df)
+
+    # mirror closes to the sheet; rows already there are skipped by date
+    if CLOSING_WORKSHEET_NAME:
+        get_gsheet_writer(SPREADSHEET_URL, CLOSING_WORKSHEET_NAME) \
+            .enqueue(closing_df)
+
+    circuit_breaker.remember('new_closing_feed2', closing_df)
 
     return closing_df
 
 
-@st.cache_data
-def display_closing_chart(source, perc_chg1):
-    """ Fn to display closing prices area charts using Altair
+def closing_fallback(start_date1, end_date1, tickers1, error1):
+    """ Function to get the last known good closing prices when the feed fails
+        (last dataset loaded by this process, else the local price store)
+        Return: closing_df (df), flagged as stale in the UI
     """
-    # yrange = (source.price.min(), source.price.max())
+    closing_df, loaded_at = circuit_breaker.last_known_good('new_closing_feed2')
+    source1 = 'stale data loaded {:%Y-%m-%d %H:%M}'.format(loaded_at) \
+        if loaded_at else None
+
+    if closing_df is None:
+        closing_mx = matrix_store.open_matrix('closing', None, MATRIX_STORE_DIR)
+        if closing_mx is not None and \
+                set(closing_mx.symbols) >= set(tickers1):
+            closing_df = closing_mx.to_frame()[tickers1]
+            source1 = 'stale data published {}'.format(
+                matrix_store.read_manifest('closing', MATRIX_STORE_DIR)
+                ['written_at'])
+
+    if closing_df is None and price_provider.persistent:
+        closing_df = price_store.read_closing(tickers1, start_date1, end_date1)
+        closing_df = frames.to_date_index(closing_df.round(decimals = 2))
+        source1 = 'stale data from the local price store'
+
+    if closing_df is None:
+        closing_df = pd.DataFrame(columns=tickers1,
+                                  index=pd.DatetimeIndex([], dtype='datetime64[ns]'))
+        source1 = 'no earlier data available'
+
+    st.warning('Price feed unavailable ({}) - {}'.format(error1, source1))
+
+    return closing_df
+
+
+def history_fallback(error1):
+    """ Function to get the last known good historical data when gsheets fails
+        Return: nasdaq_df (df, Date index), flagged as stale in the UI
+    """
+    nasdaq_df, loaded_at = circuit_breaker.last_known_good('gsheet2df')
+    history_mx = matrix_store.open_matrix('history', None, MATRIX_STORE_DIR)
+
+    if nasdaq_df is not None:
+        source1 = 'stale data loaded {:%Y-%m-%d %H:%M}'.format(loaded_at)
+    elif history_mx is not None:
+        nasdaq_df = history_mx.to_frame().rename_axis('Date').reset_index()
+        source1 = 'stale data published {}'.format(
+            matrix_store.read_manifest('history', MATRIX_STORE_DIR)
+            ['written_at'])
+    else:
+        nasdaq_df = pd.DataFrame(columns=['Date'])
+        source1 = 'no earlier data available'
+
+    st.warning('Historical data unavailable ({}) - {}'.format(error1, source1))
+
+    return nasdaq_df.set_index('Date')
+
+
+def open_or_publish(matrix_name, version1, build_fn):
+    """ Function to map a published matrix, or build (build_fn) and publish
+        it if the store has no matrix of version1. Concurrent sessions (and
+        the pre-warmer) share one open / build / publish per version.
+        Return: close_matrix.CloseMatrix
+    """
+    def load():
+        matrix1 = matrix_store.open_matrix(matrix_name, version1,
+                                           MATRIX_STORE_DIR)
+        if matrix1 is None:
+            matrix1 = matrix_store.publish(matrix_name, build_fn(), version1,
+                                           MATRIX_STORE_DIR)
+        return matrix1
+
+    return flight.do(('open_or_publish', matrix_name, version1), load)
+
+
+@loader_cache.loaders.cached
+def shared_closing_matrix(start_date1, end_date1, tickers1, provider_name,
+                          data_version):
+    """ Function to get the dense close matrix of all tickers, mapped
+        read-only from the matrix store shared by all server processes
+        (the first process to miss it fetches and publishes it)
+        Return: close_matrix.CloseMatrix
+    """
+    version = matrix_store.version_tag(provider_name, tuple(tickers1),
+                                       start_date1, end_date1, data_version)
+
+    def build_fn():
+        closing_df = new_closing_feed2(start_date1, end_date1, tickers1,
+                                       provider_name)
+        return close_matrix.CloseMatrix.from_frame(closing_df)
+
+    return open_or_publish('closing', version, build_fn)
+
+
+@loader_cache.loaders.cached
+def shared_history_matrix(spreadsheet_name, wsheet_name, provider_name,
+                          data_version):
+    """ Function to get the historical prices (Date x symbols), mapped
+        read-only from the matrix store shared by all server processes
+        Return: close_matrix.CloseMatrix
+    """
+    version = matrix_store.version_tag(provider_name, spreadsheet_name,
+                                       wsheet_name, data_version)
+
+    def build_fn():
+        nasdaq_df = gsheet2df(spreadsheet_name, wsheet_name, provider_name,
+                              data_version)
+        nasdaq_df = nasdaq_df.set_index('Date').apply(pd.to_numeric,
+                                                      errors='coerce')
+        return close_matrix.CloseMatrix.from_frame(nasdaq_df)
+
+    return open_or_publish('history', version, build_fn)
+
+
+@loader_cache.loaders.cached
+def closing_metrics(_closing_mx1, data_version):
+    """ Function to compute the returns / risk metrics of all tickers
+        (computed once per data_version; the matrix itself is not hashed)
+        Return: metrics_df (df) indexed by symbol
+    """
+    return analytics.block_metrics(_closing_mx1.values, _closing_mx1.symbols)
+
+
+def display_metrics_table(closing_mx1, data_version):
+    """ Fn to display the 1Y metrics table for all tickers """
+    if data_version is None:
+        metrics_df = analytics.block_metrics(closing_mx1.values,
+                                             closing_mx1.symbols)
+    else:
+        metrics_df = closing_metrics(closing_mx1, data_version)
+
+    pct_cols = [col for col in metrics_df.columns
+                if col not in ('last', 'sharpe')]
+
+    st.dataframe(metrics_df.style.format(
+                    '{:+.2%}', subset=pct_cols, na_rep='-'
+                 ).format('{:.2f}', subset=['last', 'sharpe'], na_rep='-'))
+
+
+@loader_cache.loaders.cached
+def closing_range_index(index_name, _closing_mx1, data_version):
+    """ Function to build a range index of all tickers: index_name is
+        'ReturnIndex' (cumulative log prices) or 'RangeMinMax' (sparse tables)
+        (built once per data_version; the matrix itself is not hashed)
+        Return: range_index.ReturnIndex | range_index.RangeMinMax
+    """
+    return getattr(range_index, index_name).from_matrix(_closing_mx1)
+
+
+def get_range_index(index_name, closing_mx1, data_version):
+    """ Fn to get a range index of closing_mx1 (stale data: not cached)
+        Return: range_index.ReturnIndex | range_index.RangeMinMax
+    """
+    if data_version is None:
+        return getattr(range_index, index_name).from_matrix(closing_mx1)
+
+    return closing_range_index(index_name, closing_mx1, data_version)
+
+
+def display_leaderboard(return_index1, start_date1, end_date1):
+    """ Fn to display all tickers ranked by their return over a date range """
+    board_df = return_index1.leaderboard(start_date1, end_date1)
+
+    st.dataframe(board_df.style.format('{:+.2%}', na_rep='-'))
+
+
+@st.cache_resource
+def get_indicator_book(provider_name):
+    """ Function to hold the indicator history + online state per process
+        Return: indicators.IndicatorBook
+    """
+    return indicators.IndicatorBook()
+
+
+def build_closing_chart(source, perc_chg1, indicator_df=None, yrange=None):
+    """ Fn to build the closing prices area chart using Altair
+        indicator_df: optional df (date + indicator columns) to overlay
+        yrange: optional (low, high) y-axis domain
+        Return: alt.Chart
+    """
+    source = downsample.downsample_series(source, CHART_WIDTH)
+    yscale = alt.Scale(domain=yrange) if yrange else alt.Undefined
 
     if perc_chg1 > 0:   area_color = 'darkGreen'
     elif perc_chg1 < 0: area_color = 'darkRed'
@@ -150,6 +502,7 @@ def display_closing_chart(source, perc_chg1):
     # )
 
     chart1 = alt.Chart(source).mark_area(
+                clip=True,
                 line={'color':area_color},
                 color=alt.Gradient(
                     gradient='linear',
@@ -162,10 +515,9 @@ def display_closing_chart(source, perc_chg1):
                 )
             ).encode(
                 alt.X('date:T'),
-                # alt.Y('price:Q', scale=alt.Scale(domain=yrange))
-                alt.Y('price:Q')
+                alt.Y('price:Q', scale=yscale)
             ).properties(
-            width=800, height=400
+            width=CHART_WIDTH, height=400
             )
 
     # tooltips = alt.Chart(source).mark_rule().encode(
@@ -176,22 +528,118 @@ def display_closing_chart(source, perc_chg1):
 
     # points = chart1.transform_filter(hover).mark_point(color='red')
 
-    st.altair_chart(chart1)# + points + tooltips)
+    if indicator_df is None or len(indicator_df) == 0:
+        return chart1# + points + tooltips
+
+    # price-scale indicators as lines over the area, oscillators below it
+    overlay_cols = [col for col in indicator_df.columns
+                    if col != 'date' and col not in PANEL_INDICATORS]
+    panel_cols = [col for col in indicator_df.columns
+                  if col in PANEL_INDICATORS]
+
+    if overlay_cols:
+        overlay = indicator_df.melt(id_vars=['date'], value_vars=overlay_cols,
+                                    var_name='indicator', value_name='value')
+        chart1 = chart1 + alt.Chart(overlay).mark_line(strokeWidth=1.5,
+                                                       clip=True).encode(
+                    alt.X('date:T'),
+                    alt.Y('value:Q'),
+                    color='indicator:N'
+                )
+
+    if panel_cols:
+        panel = indicator_df.melt(id_vars=['date'], value_vars=panel_cols,
+                                  var_name='indicator', value_name='value')
+        chart1 = alt.vconcat(chart1, alt.Chart(panel).mark_line().encode(
+                    alt.X('date:T'),
+                    alt.Y('value:Q', title=None),
+                    color='indicator:N'
+                ).properties(
+                width=CHART_WIDTH, height=120
+                ))
 
+    return chart1
 
-@st.cache_data
-def display_historical_chart(source):
-    """ Fn to display multiple line charts on a singe axis using Altair
+
+def display_closing_chart(dates1, prices1, perc_chg1, chart_key,
+                          indicator_df=None, yrange=None):
+    """ Fn to display closing prices area charts using Altair
+        dates1, prices1: read-only views of the symbol's period (the chart
+        df is only built when the spec is not cached)
+        chart_key: (symbol, period, indicators, data version), the built
+        spec is cached under it (None: build without caching)
+    """
+    spec = chart_cache.specs.get_or_build(
+        chart_key and ('closing',) + chart_key,
+        lambda: build_closing_chart(frames.view_frame(dates1, prices1),
+                                    perc_chg1, indicator_df, yrange))
+
+    st.vega_lite_chart(dict(spec))
+
+
+def vegafusion_aggregate(source):
+    """ Fn to bucket the historical prices server-side with VegaFusion
+        The Vega timeunit / aggregate transforms run in-process, so only
+        about CHART_WIDTH mean prices per symbol reach the browser. Each
+        bucket is plotted at its first date (a week bucket starts on the
+        Sunday before, possibly in the previous year).
+        Return: long df (date, symbol, price), source itself if it has at
+        most CHART_WIDTH rows per symbol, None if vegafusion is missing
+    """
+    try:
+        import vegafusion # noqa: F401 (used by chart.transformed_data)
+    except ImportError:
+        return None
+
+    if len(source) == 0 or \
+            source.groupby('symbol', observed=True).size().max() <= CHART_WIDTH:
+        return source   # already at (or below) the chart resolution
+
+    # finest unit with at most CHART_WIDTH buckets over the date span
+    span_days = (source['date'].max() - source['date'].min()).days
+    if span_days <= CHART_WIDTH:          time_unit = 'yearmonthdate'
+    elif span_days <= 7 * CHART_WIDTH:    time_unit = 'yearweek'
+    elif span_days <= 30 * CHART_WIDTH:   time_unit = 'yearmonth'
+    else:                                 time_unit = 'year'
+
+    rows = alt.Chart(source).transform_timeunit(
+        bucket='{}(date)'.format(time_unit)
+    ).transform_aggregate(
+        price='mean(price)', first_date='min(date)',
+        groupby=['bucket', 'symbol']
+    ).transformed_data()
+
+    rows['date'] = rows['first_date'].dt.tz_localize(None).astype(
+        'datetime64[ns]')
+
+    return rows[['date', 'symbol', 'price']].sort_values(['symbol', 'date'])
+
+
+def build_historical_chart(source, server_side=False):
+    """ Fn to build multiple line charts on a singe axis using Altair
         Input: nasdaq_df from fn: read_historical_csv
+        server_side: aggregate with VegaFusion first (falls back to LTTB)
+        Return: alt.LayerChart
     """
+    rows = vegafusion_aggregate(source) if server_side else None
+    if rows is not None:
+        source = rows
+    else:
+        source = downsample.downsample_long(source, CHART_WIDTH)
+
+    # one dataset for all layers: only the encoded columns, prices rounded
+    # (as float64, float32 values serialize to long decimal strings)
+    source = source[['date', 'symbol', 'price']].assign(
+        price=source['price'].astype('float64').round(decimals = 2))
+
     # a selection that chooses the nearest x-value point
     nearest = alt.selection(type='single', nearest=True, on='mouseover',
                             fields=['date'], empty='none')
 
     selection_legend = alt.selection_multi(fields=['symbol'], bind='legend')
 
-    # Define the basic line
-    line = alt.Chart(source).mark_line().encode(
+    # Define the basic line (layers carry no data, it is bound on the layer)
+    line = alt.Chart().mark_line().encode(
         x=alt.X('date:T', axis = alt.Axis(format=("%Y"))),
 
         y=alt.Y('price:Q',
@@ -216,27 +664,15 @@ def display_historical_chart(source):
     )
 
     # Transparent selectors across the chart, tells us x-value of the cursor
-    selectors = alt.Chart(source).mark_point().encode(
+    selectors = alt.Chart().mark_point().encode(
         x='date:T',
         opacity=alt.value(0),
     ).add_selection(
         nearest
     )
 
-    # Draw points on the line, and highlight based on selection
-    points = line.mark_point().encode(
-        opacity=alt.condition(nearest, alt.value(1), alt.value(0))
-    )
-
-    # Draw text labels near the points, and highlight based on selection
-    text = line.mark_text(align='right', dx=-10, dy=-5).encode(
-        text=alt.condition(nearest, 'price:Q', alt.value(''), format='.2f'),
-        opacity=alt.condition(selection_legend, alt.value(1), alt.value(0.5)),
-        size=alt.condition(selection_legend, alt.value(20), alt.value(10))
-    )
-
     # Draw a rule at the location of the selection
-    rules = alt.Chart(source).mark_rule(color='gray').encode(
+    rules = alt.Chart().mark_rule(color='gray').encode(
         x='date:T',
     ).transform_filter(
         nearest
@@ -244,14 +680,60 @@ def display_historical_chart(source):
 
     # Put the five layers into a chart and bind the data
     layer = alt.layer(
-                line, selectors, points, rules, text
+                line, selectors, points, rules, text, data=source
             ).properties(
-                width=800, height=400
+                width=CHART_WIDTH, height=400
             ).add_selection(
                 selection_legend
             )
 
-    st.altair_chart(layer)
+    return layer
+
+
+def display_historical_chart(source, chart_key):
+    """ Fn to display multiple line charts on a singe axis using Altair
+        chart_key: (provider, data version), the built spec is cached under it
+        (None: build without caching)
+    """
+    spec = chart_cache.specs.get_or_build(
+        chart_key and ('historical', HISTORY_SERVER_SIDE) + chart_key,
+        lambda: build_historical_chart(source, HISTORY_SERVER_SIDE))
+
+    st.vega_lite_chart(dict(spec))
+
+
+def prewarm_caches():
+    """ Function to load the cached data for the latest closed session
+        (runs on the pre-warmer thread, outside of any page render)
+    """
+    last_session1 = trading_calendar.last_completed_session()
+
+    shared_closing_matrix(
+        start_date1 = trading_calendar.sessions_back(last_session1, DATA_SESSIONS),
+        end_date1 = last_session1 + timedelta(days=1),
+        tickers1 = TICKERS,
+        provider_name = PRICE_PROVIDER,
+        data_version = last_session1)
+
+    shared_history_matrix(SPREADSHEET_URL, WORKSHEET_NAME, HISTORY_PROVIDER,
+                          data_version = last_session1)
+
+
+@st.cache_resource
+def start_prewarmer(_jobs):
+    """ Function to start one background pre-warmer per server process
+        Return: prewarm.PreWarmer (thread)
+    """
+    prewarmer = prewarm.PreWarmer(_jobs)
+    prewarmer.start()
+
+    return prewarmer
+
+
+# %% Part 3.1 : Background cache pre-warmer
+
+if PREWARM_ENABLED:
+    start_prewarmer([prewarm_caches])
 
 
 # %% Part 4 : Sidebar (Select Stock Symbol & Display Period)
@@ -271,13 +753,20 @@ with st.sidebar.form(key='sidebar_form'):
                                    value=PERIOD_INPUT_DEFAULT,
                                    help='Slide options: 1Year, 6Months, 3Months, 1Month, 1Week')
 
-    period_map = {'1Y': 365,'6M': 182, '3M':91, '1M': 30,'1W': 7}
+    indicator_input = st.multiselect(label='Indicators:',
+                                     options=list(INDICATOR_OPTIONS),
+                                     default=[],
+                                     help='Technical indicators to overlay on the closing price chart')
+
+    # display periods in trading sessions (exact over weekends / holidays)
+    period_map = {'1Y': 252,'6M': 126, '3M': 63, '1M': 21,'1W': 5}
     period_input_map = period_map.get(period_input)
-    now_date_minusT0 = (dt.now().date()) - timedelta(days=period_input_map)
+    now_date_minusT0 = trading_calendar.sessions_back(last_session,
+                                                      period_input_map)
 
-    now_date_minusT1 = (dt.now().date() - timedelta(days=1)) - timedelta(days=period_input_map)
+    now_date_minusT1 = last_session
 
-    st.write('selected period input {} days'.format(period_input_map))
+    st.write('selected period input {} trading sessions'.format(period_input_map))
 
     st.write('from date: ', now_date_minusT0)
     st.write('to date: ', now_date_minusT1)
@@ -290,41 +779,98 @@ with st.sidebar.form(key='sidebar_form'):
 # %% Part 5 : Display Headers & Closing Price Plot (PLot 1) and DF
 
 # Fetch data from yfinance feed / gsheets data file
-closing_df = new_closing_feed2(start_date1 = now_date_minus1Y,
-                               end_date1 = dt.now().date(),
-                               tickers1 = TICKERS)
-
-# Filter closing_df data by sidebar selections
-period_filter = (closing_df.index >= now_date_minusT1) & \
-                    (closing_df.index < now_date)
-
-filtered_df = closing_df[[symbol_input]][period_filter]
-filtered_df = filtered_df.reset_index()
-filtered_df.columns = ['date', 'price']
+# (falls back to the last known good data if the feed is down)
+# The hot path below runs on a dense (dates x symbols) close matrix, mapped
+# read-only from the store shared by all server processes; pandas frames
+# are only built for display
+try:
+    closing_mx = shared_closing_matrix(start_date1 = data_start_date,
+                                       end_date1 = data_end_date,
+                                       tickers1 = TICKERS,
+                                       provider_name = PRICE_PROVIDER,
+                                       data_version = last_session)
+    closing_version = (PRICE_PROVIDER, last_session)
+except Exception as err:
+    closing_df = closing_fallback(data_start_date, data_end_date, TICKERS, err)
+    closing_mx = close_matrix.CloseMatrix.from_frame(closing_df)
+    closing_version = None # stale data, do not cache charts built from it
+
+# Filter closing data by sidebar selections (binary search of the sorted
+# dates; read-only views of the symbol's period - nothing is copied)
+period_dates, period_prices = closing_mx.column(symbol_input,
+                                                now_date_minusT0,
+                                                now_date_minusT1)
+
+# Technical indicators for the selected symbol & period (after the first
+# build, each new trading day is an O(1) online update per ticker)
+indicator_cols = [col for option in indicator_input
+                  for col in INDICATOR_OPTIONS[option]]
+
+if indicator_cols and len(period_prices) > 0:
+    if closing_version is None: # stale data, keep it out of the running state
+        indicator_hist = indicators.compute_indicators(closing_mx.to_frame())
+    else:
+        indicator_hist = get_indicator_book(PRICE_PROVIDER).sync(
+            closing_mx.to_frame())
+
+    indicator_df = indicator_hist[symbol_input].reindex(period_dates)
+    indicator_df = indicator_df[indicator_cols].rename_axis('date').reset_index()
+else:
+    indicator_df = None
 
 # ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^
 
 # if headers data is not blank continue, else display error message
-if len(filtered_df) > 0 :
+if len(period_prices) > 0 :
 
-    price_orig = filtered_df.iat[0, 1]
-    price_new = filtered_df.iat[-1, 1]
+    price_orig = period_prices[0]
+    price_new = period_prices[-1]
 
     st.write('1st price: ', price_orig, ' date: ', now_date_minus1Y )
     st.write('last price: ', price_new, ' date: ', now_date )
 
-    period_perc_chg = ((price_new - price_orig) / price_orig) * 100
+    # any [start, end] range return is two lookups in the cumulative index
+    return_index = get_range_index('ReturnIndex', closing_mx, closing_version)
+    period_perc_chg = return_index.range_return(
+        now_date_minusT0, now_date_minusT1, symbol_input) * 100
+    period_ann_chg = return_index.annualized_return(
+        now_date_minusT0, now_date_minusT1, symbol_input) * 100
 
     st.write('{} stock % change since {}: {:+.2f}%'.format(symbol_input,
                                                now_date_minusT0,
                                                period_perc_chg))
+    st.write('{} annualized: {:+.2f}%'.format(symbol_input, period_ann_chg))
 
-    # Display Atair line-chart
-    display_closing_chart(filtered_df, period_perc_chg)
+    # period / 52-week highs & lows are O(1) sparse table queries
+    minmax_index = get_range_index('RangeMinMax', closing_mx, closing_version)
+    st.write('{} 52-week high: {:.2f}  low: {:.2f}'.format(symbol_input,
+        minmax_index.high(data_start_date, last_session, symbol_input),
+        minmax_index.low(data_start_date, last_session, symbol_input)))
 
-    filtered_df = filtered_df.sort_index(ascending=False)
+    # Display Atair line-chart
+    display_closing_chart(period_dates, period_prices, period_perc_chg,
+                          chart_key = closing_version and
+                              (symbol_input, period_input,
+                               tuple(indicator_cols)) + closing_version,
+                          indicator_df = indicator_df,
+                          yrange = minmax_index.domain(now_date_minusT0,
+                                                       now_date_minusT1,
+                                                       symbol_input))
+
+    # Display 1Y returns / risk metrics for all tickers
+    st.write('1Y metrics (annualized, all symbols):')
+    display_metrics_table(closing_mx, closing_version)
+
+    # Display all tickers ranked by return over the selected period
+    st.write('{} returns leaderboard:'.format(period_input))
+    display_leaderboard(return_index, now_date_minusT0, now_date_minusT1)
+
+    # newest first, the only df built from the period views
+    filtered_df = frames.view_frame(period_dates, period_prices,
+                                    descending=True)
     # Display raw data as a table
-    st.dataframe(filtered_df)
+    st.dataframe(filtered_df,
+                 column_config={'date': st.column_config.DateColumn('date')})
 
 else:
     st.subheader('No data available')
@@ -335,14 +881,33 @@ else:
 st.header('Historical NASDAQ Prices')
 
 # nasdaq_df, npivot_df = read_historical_csv(NSTOCKS_PATH, TICKERS)
-nasdaq_df = gsheet2df(SPREADSHEET_URL, WORKSHEET_NAME)
-
-# melt df i.e. unpivot data
-df_melt = nasdaq_df.melt(id_vars=['Date'])
-df_melt.columns=['date', 'symbol','price']
+try:
+    nasdaq_df = shared_history_matrix(SPREADSHEET_URL, WORKSHEET_NAME,
+                                      HISTORY_PROVIDER,
+                                      data_version = last_session) \
+        .to_frame().rename_axis('Date')
+    history_version = (HISTORY_PROVIDER, last_session)
+except Exception as err:
+    nasdaq_df = history_fallback(err)
+    history_version = None # stale data, do not cache charts built from it
+
+# melt df i.e. unpivot data (compact typed long format, cached unless stale)
+if history_version is None:
+    df_melt = frames.melt_compact(nasdaq_df.reset_index(), date_col='Date')
+else:
+    df_melt = melt_historical(nasdaq_df, HISTORY_PROVIDER, last_session)
 
 # Display Atair historical line-chart (using long format nasdaq data)
-display_historical_chart(df_melt)
+display_historical_chart(df_melt, chart_key = history_version)
 
 # Display raw data as a table
 st.write(nasdaq_df)
+
+# Loader cache usage of this server process
+cache_stats = loader_cache.loaders.stats()
+st.sidebar.caption('Data cache: {entries} entries, {mb:.1f} / {max_mb:.0f} MB, '
+                   '{hits} hits, {misses} misses ({disk_hits} from disk), '
+                   '{evictions} evictions'
+                   .format(mb=cache_stats['bytes'] / 2**20,
+                           max_mb=cache_stats['max_bytes'] / 2**20,
+                           **cache_stats))
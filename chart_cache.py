@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: chart_cache.py
+# Description: Vega-Lite chart spec cache for the YFinance app
+#
+# Built chart specs are kept per process under cheap keys (chart kind,
+# symbol, period, data version) so a rerun neither hashes the source df
+# (as st.cache_data on the display functions did) nor rebuilds the chart.
+# Specs are serialized with Altair's 5000-row limit lifted: the full price
+# history is inlined as a dataset and the browser renders it either way.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+from collections import OrderedDict
+import threading
+
+import altair as alt
+
+
+MAX_SPECS = 256
+
+# the data transformer options are process-global, serialize under one lock
+_serialize_lock = threading.Lock()
+
+
+#%% Classes
+
+class ChartSpecCache:
+    """ LRU cache of Vega-Lite spec dicts """
+
+    def __init__(self, max_entries=MAX_SPECS):
+        self.max_entries = max_entries
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build_fn):
+        """ Fn to get the spec for key, building it with build_fn() on a miss
+            build_fn returns an Altair chart; key=None skips the cache
+            Return: Vega-Lite spec (dict)
+        """
+        if key is not None:
+            with self._lock:
+                if key in self._specs:
+                    self._specs.move_to_end(key)
+                    return self._specs[key]
+
+        chart = build_fn()
+        with _serialize_lock, alt.data_transformers.disable_max_rows():
+            spec = chart.to_dict()
+
+        if key is not None:
+            with self._lock:
+                self._specs[key] = spec
+                while len(self._specs) > self.max_entries:
+                    self._specs.popitem(last=False)
+
+        return spec
+
+
+# process-wide instance shared by all sessions (module is imported once)
+specs = ChartSpecCache()
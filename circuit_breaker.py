@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: circuit_breaker.py
+# Description: Circuit breaker and last-known-good fallback for upstream calls
+#
+# A logical upstream call (e.g. refresh the closes of a universe) is retried
+# with exponential backoff and counts as one failure if all attempts fail.
+# The timeout applies to each upstream request inside it (one batch, one
+# ticker, one sheet read) via request(), so a large chunked universe is not
+# bounded by a single deadline. A timed-out request cannot be killed: while
+# it is still running, no retry or new call is started for that upstream.
+# After failure_threshold consecutive failed calls the circuit opens and
+# calls fail fast for reset_timeout seconds, then a trial call is let
+# through (half-open). Callers fall back to the last successfully loaded
+# dataset, which is kept per loader name.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime as dt
+import logging
+import random
+import threading
+import time
+
+
+CALL_TIMEOUT = 20        # seconds per upstream request
+RETRIES = 2              # extra attempts after the first failure
+BACKOFF_BASE = 1.0       # seconds, doubled per attempt (plus jitter)
+BACKOFF_MAX = 30.0
+FAILURE_THRESHOLD = 3    # consecutive failed calls before the circuit opens
+RESET_TIMEOUT = 300      # seconds the circuit stays open
+
+logger = logging.getLogger(__name__)
+
+# timed requests run here; timed-out ones finish on it in the background
+# (sized above the fetch engine's concurrency so requests do not queue)
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='upstream')
+
+
+#%% Classes
+
+class CircuitOpenError(RuntimeError):
+    """ Raised instead of calling upstream while the circuit is open """
+
+
+class CircuitBreaker:
+    """ Timeout / retry / fail-fast wrapper around one upstream """
+
+    def __init__(self, name, call_timeout=CALL_TIMEOUT, retries=RETRIES,
+                 failure_threshold=FAILURE_THRESHOLD,
+                 reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.call_timeout = call_timeout
+        self.retries = retries
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._running = set()   # timed-out requests still in flight
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    @property
+    def busy(self):
+        """ True while a timed-out request of this upstream is still running """
+        with self._lock:
+            return bool(self._running)
+
+    def _finished(self, future):
+        with self._lock:
+            self._running.discard(future)
+
+    def _record(self, ok):
+        with self._lock:
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self.opened_at = time.monotonic()
+
+    def request(self, fn, *args, **kwargs):
+        """ Fn to make one upstream request with the per-request timeout
+            Return: fn's result (raises TimeoutError or fn's error)
+        """
+        future = _executor.submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=self.call_timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._running.add(future)
+            future.add_done_callback(self._finished)
+            raise TimeoutError('{} request timed out after {}s'
+                               .format(self.name, self.call_timeout))
+
+    def call(self, fn, *args, **kwargs):
+        """ Fn to make one logical upstream call with retries and backoff
+            (fn's upstream requests should go through request())
+            Return: fn's result (raises CircuitOpenError or the last error)
+        """
+        if self.state == 'open':
+            raise CircuitOpenError('{} circuit open'.format(self.name))
+        if self.busy:
+            # do not pile new requests onto an upstream that has not answered
+            raise TimeoutError('{} still waiting on a timed-out request'
+                               .format(self.name))
+
+        for attempt in range(self.retries + 1):
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as err:
+                error = err
+            else:
+                self._record(ok=True)
+                return result
+
+            logger.warning('%s attempt %d failed: %s', self.name, attempt + 1,
+                           error)
+            # no retry while the timed-out attempt is still running upstream
+            if attempt == self.retries or self.busy:
+                break
+
+            backoff = min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX)
+            time.sleep(backoff * random.uniform(0.5, 1.0))
+
+        self._record(ok=False)  # one failure per logical call
+        raise error
+
+
+#%% Functions - Breakers & last-known-good datasets (process wide)
+
+_breakers = {}
+_last_good = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name, **kwargs):
+    """ Fn to get (or create) the process-wide breaker for an upstream """
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **kwargs)
+        return _breakers[name]
+
+
+def remember(name, data):
+    """ Fn to record the latest successfully loaded dataset of a loader """
+    _last_good[name] = (data, dt.now())
+
+
+def last_known_good(name):
+    """ Fn to get the latest successfully loaded dataset of a loader
+        Return: (data, loaded_at) or (None, None)
+    """
+    return _last_good.get(name, (None, None))
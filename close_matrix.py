@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: close_matrix.py
+# Description: Dense closing price matrix for the YFinance app hot path
+#
+# CloseMatrix holds the closes as one read-only float64 array (dates x
+# symbols, column-major so each symbol's history is contiguous), a sorted
+# datetime64 date array and a dict symbol -> column. Periods are found by
+# binary search and handed out as views; pandas objects are only built at
+# the UI edge (to_frame, frames.view_frame).
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+import numpy as np
+import pandas as pd
+
+
+#%% Functions
+
+def ffill_block(values):
+    """ Fn to forward fill the NaNs of a (dates x symbols) block down each
+        column (leading NaNs stay NaN)
+        Return: np.ndarray, same shape
+    """
+    if values.size == 0:
+        return values
+
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, None])
+    rows = np.maximum.accumulate(rows, axis=0)
+
+    return values[rows, np.arange(values.shape[1])]
+
+
+#%% Classes
+
+class CloseMatrix:
+    """ Closing prices as a dense (dates x symbols) float64 array """
+
+    def __init__(self, dates, values, symbols, copy=True):
+        """ copy=False wraps dates / values as they are (already sorted
+            datetime64[ns] / float64 arrays, e.g. read-only memory maps)
+        """
+        self.symbols = list(symbols)
+        self.columns = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        if not copy:
+            self.dates, self.values = dates, values
+            return
+
+        self.dates = np.array(dates, dtype='datetime64[ns]')
+        self.values = np.array(values, dtype='float64', order='F')
+
+        order = np.argsort(self.dates, kind='stable')
+        if np.any(order != np.arange(len(order))):
+            self.dates = self.dates[order]
+            self.values = np.asfortranarray(self.values[order])
+
+        self.dates.flags.writeable = False
+        self.values.flags.writeable = False
+
+    @classmethod
+    def from_frame(cls, closing_df):
+        """ Fn to build the matrix from closing_df (date index x symbols)
+            Return: CloseMatrix
+        """
+        dates = pd.to_datetime(closing_df.index)
+        if getattr(dates, 'tz', None) is not None:
+            dates = dates.tz_localize(None)
+
+        return cls(dates.to_numpy(dtype='datetime64[ns]'),
+                   closing_df.to_numpy(dtype='float64'), closing_df.columns)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def nbytes(self):
+        """ Resident bytes (memory-mapped arrays live in the page cache) """
+        return sum(array.nbytes for array in (self.dates, self.values)
+                   if not isinstance(array, np.memmap))
+
+    def rows(self, start_date=None, end_date=None):
+        """ Fn to find the rows within [start_date, end_date] (both
+            inclusive, None: unbounded) by binary search
+            Return: slice of row positions
+        """
+        i = 0 if start_date is None else np.searchsorted(
+            self.dates, np.datetime64(pd.Timestamp(start_date)), side='left')
+        j = len(self.dates) if end_date is None else np.searchsorted(
+            self.dates, np.datetime64(pd.Timestamp(end_date)), side='right')
+
+        return slice(int(i), int(max(i, j)))
+
+    def block(self, start_date=None, end_date=None):
+        """ Fn to get all symbols over [start_date, end_date]
+            Return: (dates, values) read-only views
+        """
+        rows = self.rows(start_date, end_date)
+
+        return self.dates[rows], self.values[rows]
+
+    def column(self, symbol, start_date=None, end_date=None):
+        """ Fn to get one symbol over [start_date, end_date]
+            Return: (dates, prices) read-only views (prices contiguous)
+        """
+        rows = self.rows(start_date, end_date)
+
+        return self.dates[rows], self.values[rows, self.columns[symbol]]
+
+    def to_frame(self, start_date=None, end_date=None):
+        """ Fn to adapt the matrix (or a period of it) to a pandas df
+            Return: df (datetime64 index x symbols), sharing the buffer
+        """
+        dates, values = self.block(start_date, end_date)
+
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates),
+                            columns=self.symbols, copy=False)
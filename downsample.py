@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: downsample.py
+# Description: Server-side LTTB downsampling before Altair rendering
+#
+# Largest-Triangle-Three-Buckets keeps the first and last points and, per
+# bucket, the point forming the largest triangle with the previously kept
+# point and the next bucket's average. Series are cut to about the chart's
+# pixel width, so the Vega-Lite payload no longer grows with the history.
+# All series of a long-format df are sampled together: the only Python loop
+# is over the buckets (about the chart width), each step handles the bucket
+# of every series with NumPy (prefix sums for the bucket averages, a
+# segmented argmax for the kept points).
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+import numpy as np
+import pandas as pd
+
+
+#%% Functions
+
+def lttb_grouped(x, y, offsets, n_out):
+    """ Fn to pick the LTTB sample of many series at once
+        x, y: concatenated series, each sorted by x; series g is the rows
+        offsets[g]:offsets[g + 1]
+        Return: np.ndarray of row positions, in row order (all rows of the
+        series with at most n_out rows)
+    """
+    offsets = np.asarray(offsets, dtype='int64')
+    sizes = np.diff(offsets)
+    if n_out < 3 or len(sizes) == 0 or sizes.max() <= n_out:
+        return np.arange(offsets[-1] if len(offsets) else 0)
+
+    y = np.asarray(y, dtype='float64')
+    # x relative to each series' first point (keeps the prefix sums exact)
+    x = np.asarray(x, dtype='float64') - \
+        np.repeat(np.asarray(x, dtype='float64')[offsets[:-1]], sizes)
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+
+    long = np.flatnonzero(sizes > n_out)
+    base, n = offsets[long], sizes[long]
+    every = (n - 2) / (n_out - 2)
+
+    kept = np.empty((len(long), n_out), dtype='int64')
+    kept[:, 0], kept[:, -1] = base, base + n - 1
+
+    a = base.copy()
+    for i in range(n_out - 2):
+        start = base + (i * every).astype('int64') + 1
+        end = base + ((i + 1) * every).astype('int64') + 1
+        next_end = base + np.minimum(((i + 2) * every).astype('int64') + 1, n)
+
+        span = next_end - end
+        avg_x = (cum_x[next_end] - cum_x[end]) / span
+        avg_y = (cum_y[next_end] - cum_y[end]) / span
+
+        # candidates of every series' bucket, laid end to end
+        width = end - start
+        first = np.cumsum(width) - width
+        seg = np.repeat(np.arange(len(long)), width)
+        pos = np.arange(width.sum()) - first[seg] + start[seg]
+
+        # twice the triangle area for every candidate
+        xa, ya = x[a][seg], y[a][seg]
+        area = np.abs((xa - avg_x[seg]) * (y[pos] - ya) -
+                      (xa - x[pos]) * (avg_y[seg] - ya))
+
+        # segmented argmax: first candidate reaching its bucket's maximum
+        best = np.maximum.reduceat(area, first)
+        hits = np.flatnonzero(area == best[seg])
+        _, first_hit = np.unique(seg[hits], return_index=True)
+        a = pos[hits[first_hit]]
+        kept[:, i + 1] = a
+
+    short = np.flatnonzero(sizes <= n_out)
+    rows = [kept.ravel()] + [np.arange(offsets[g], offsets[g + 1])
+                             for g in short]
+
+    return np.sort(np.concatenate(rows))
+
+
+def lttb_indices(x, y, n_out):
+    """ Fn to pick the LTTB sample of a series sorted by x
+        Return: np.ndarray of row positions (all rows if n_out >= len(x))
+    """
+    return lttb_grouped(x, y, [0, len(x)], n_out)
+
+
+def _x_values(values):
+    """ Fn to turn dates into int64 nanoseconds for the triangle areas """
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').view('int64')
+
+    return pd.to_datetime(values).asi8
+
+
+def downsample_series(source, n_out, x='date', y='price'):
+    """ Fn to LTTB downsample a single-series df (NaN prices dropped)
+        Return: df with at most n_out rows
+    """
+    source = source.dropna(subset=[y]).sort_values(x)
+    if len(source) <= n_out:
+        return source
+
+    return source.iloc[lttb_indices(_x_values(source[x].to_numpy()),
+                                    source[y].to_numpy(), n_out)]
+
+
+def downsample_long(source, n_out, x='date', y='price', by='symbol'):
+    """ Fn to LTTB downsample every series of a long-format df
+        (NaN prices dropped, series in order of first appearance)
+        Return: df with at most n_out rows per `by` group
+    """
+    if len(source) == 0:
+        return source
+
+    groups = source.groupby(by, observed=True, sort=False).ngroup() \
+                   .to_numpy()
+    if np.bincount(groups).max() <= n_out:
+        return source
+
+    keep = source[y].notna().to_numpy()
+    source, groups = source[keep], groups[keep]
+    if len(source) == 0:
+        return source
+    x_values = _x_values(source[x].to_numpy())
+
+    # one block per series, sorted by x inside it (melt_compact output
+    # already is: symbol-major, dates ascending)
+    step = np.diff(groups)
+    if np.all(step >= 0) and np.all((np.diff(x_values) >= 0) | (step > 0)):
+        order = np.arange(len(groups))
+    else:
+        order = np.lexsort((x_values, groups))
+    offsets = np.searchsorted(groups[order], np.arange(groups.max() + 2))
+
+    rows = lttb_grouped(x_values[order], source[y].to_numpy()[order],
+                        offsets, n_out)
+
+    return source.iloc[order[rows]].reset_index(drop=True)
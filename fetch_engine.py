@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: fetch_engine.py
+# Description: Asyncio fetch engine for per-ticker price history
+#
+# Replaces the serial `for symbol in tickers: yf.Ticker(symbol).history(...)`
+# loop (with pd.concat inside the loop) of the older new_closing_feed.
+# Requests run concurrently, bounded by a semaphore, and the wide close
+# matrix is assembled once from the collected list.
+#
+# fetch_chunked splits a large universe into batches of bulk downloads run in
+# parallel; a failed batch is logged and the other batches are kept, and
+# the first error is raised only when every batch failed.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+
+import pandas as pd
+
+
+MAX_CONCURRENCY = 8
+
+CHUNK_SIZE = 100   # tickers per bulk download
+CHUNK_WORKERS = 4  # bulk downloads in flight
+
+logger = logging.getLogger(__name__)
+
+
+#%% Functions
+
+def yf_ticker_close(symbol, start_date, end_date):
+    """ Fn to fetch the closing price history of one ticker (blocking)
+        Return: closing price series (tz-naive DatetimeIndex) named symbol
+    """
+    import yfinance as yf
+
+    hist = yf.Ticker(symbol).history(start=start_date, end=end_date,
+                                     auto_adjust=True)
+    close = hist['Close'].rename(symbol)
+    close.index = close.index.tz_localize(None).normalize()
+
+    return close
+
+
+async def _fetch_one(symbol, start_date, end_date, semaphore, history_fn):
+    async with semaphore:
+        # the yfinance client is blocking, so run it on the default executor
+        return await asyncio.to_thread(history_fn, symbol, start_date, end_date)
+
+
+async def fetch_histories(tickers, start_date, end_date,
+                          history_fn=yf_ticker_close,
+                          max_concurrency=MAX_CONCURRENCY):
+    """ Fn to fetch per-ticker histories concurrently
+        Return: list of (symbol, series or exception) in tickers order
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [_fetch_one(symbol, start_date, end_date, semaphore, history_fn)
+             for symbol in tickers]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    return list(zip(tickers, results))
+
+
+def fetch_closing_matrix(tickers, start_date, end_date,
+                         history_fn=yf_ticker_close,
+                         max_concurrency=MAX_CONCURRENCY):
+    """ Fn to fetch closing prices for all tickers and build the wide matrix
+        Failed or empty tickers are logged and left out; if every ticker
+        failed, the first error is raised.
+        Return: closing df (DatetimeIndex x tickers), None if the requests
+        succeeded but returned no rows
+    """
+    results = asyncio.run(fetch_histories(tickers, start_date, end_date,
+                                          history_fn, max_concurrency))
+
+    closes, errors = [], []
+    for symbol, result in results:
+        if isinstance(result, Exception):
+            logger.warning('history fetch failed for %s: %s', symbol, result)
+            errors.append(result)
+        elif result is not None and len(result) > 0:
+            closes.append(result)
+
+    if errors and len(errors) == len(results):
+        raise errors[0]
+
+    if not closes:
+        return None
+
+    # single concat over the collected list (no copying inside the loop)
+    return pd.concat(closes, axis=1).sort_index()
+
+
+def fetch_chunked(tickers, start_date, end_date, download_fn,
+                  chunk_size=CHUNK_SIZE, max_workers=CHUNK_WORKERS):
+    """ Fn to bulk download a large universe in parallel batches
+        download_fn(tickers, start, end) -> wide closes df (or None) per batch
+        Return: closing df (DatetimeIndex x tickers) from the batches that
+        succeeded, None if they all came back empty (raises the first
+        batch error if no batch succeeded)
+    """
+    chunks = [tickers[i:i + chunk_size]
+              for i in range(0, len(tickers), chunk_size)]
+
+    closes, errors = [], []
+    with ThreadPoolExecutor(max_workers=max_workers,
+                            thread_name_prefix='yf-chunk') as pool:
+        futures = {pool.submit(download_fn, chunk, start_date, end_date): chunk
+                   for chunk in chunks}
+
+        # keep each batch's closes as it lands, raw downloads are released
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                chunk_df = future.result()
+            except Exception as err:
+                logger.warning('bulk download failed for %d tickers (%s...): %s',
+                               len(chunk), chunk[0], err)
+                errors.append(err)
+                continue
+
+            if chunk_df is not None and len(chunk_df) > 0:
+                closes.append(chunk_df)
+
+    # nothing succeeded: surface it to the breaker / stale fallback
+    if errors and len(errors) == len(chunks):
+        raise errors[0]
+    if not closes:
+        return None
+
+    return pd.concat(closes, axis=1).sort_index()
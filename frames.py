@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: frames.py
+# Description: Compact typed data frames for the YFinance app
+#
+# Long-format (date, symbol, price) frames are built directly from the wide
+# NumPy block instead of df.melt: categorical symbols (small int codes),
+# float32 prices and an int64-backed datetime64[ns] date column.
+# Closing frames get a sorted, tz-naive datetime64 index (to_date_index).
+# Periods are cut by binary search in close_matrix.py and come as read-only
+# NumPy views; a df is only built from them (in one allocation) for display.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+import numpy as np
+import pandas as pd
+
+
+#%% Functions
+
+def melt_compact(wide_df, date_col='Date'):
+    """ Fn to unpivot a wide price df (date column + one column per symbol)
+        Same row order as wide_df.melt(id_vars=[date_col]).
+        Return: long df with columns date (datetime64), symbol (category),
+        price (float32)
+    """
+    symbols = [col for col in wide_df.columns if col != date_col]
+    dates = pd.to_datetime(wide_df[date_col]).to_numpy(dtype='datetime64[ns]')
+
+    # dates x symbols block, non-numeric sheet cells become NaN
+    values = wide_df[symbols].apply(pd.to_numeric, errors='coerce') \
+                             .to_numpy(dtype='float32')
+    n_dates, n_symbols = values.shape
+
+    codes = np.repeat(np.arange(n_symbols, dtype='int16'), n_dates)
+
+    return pd.DataFrame({
+        'date': np.tile(dates, n_symbols),
+        'symbol': pd.Categorical.from_codes(codes, categories=symbols),
+        'price': values.T.reshape(-1),   # symbol-major, like df.melt
+    })
+
+
+def to_date_index(closing_df):
+    """ Fn to give a date-indexed df a sorted, tz-naive datetime64 index
+        (normalized to midnight)
+        Return: df (same data, not copied if already sorted)
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(closing_df.index))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    closing_df = closing_df.set_axis(index.normalize().as_unit('ns'), axis=0)
+
+    if not closing_df.index.is_monotonic_increasing:
+        closing_df = closing_df.sort_index()
+
+    return closing_df
+
+
+def view_frame(dates, prices, descending=False):
+    """ Fn to build a (date, price) display df from period view arrays
+        (each column is copied once, reversed for newest first)
+        Return: df with columns date, price
+    """
+    step = -1 if descending else 1
+
+    return pd.DataFrame({'date': dates[::step], 'price': prices[::step]})
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: gsheet_writer.py
+# Description: Batched write-behind queue for Google Sheet appends
+#
+# Replaces the synchronous gsheet_append of ver0.5 (authorize, open and
+# append inside the page render). Sessions only enqueue rows; a background
+# worker dedups them by date and appends one batch per flush through a single
+# authorized gspread client.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+import logging
+import math
+import threading
+
+
+FLUSH_INTERVAL = 30 # seconds
+MAX_BATCH = 500     # rows, flush early once this many are pending
+
+logger = logging.getLogger(__name__)
+
+
+#%% Classes
+
+class GSheetWriteBehind:
+    """ Write-behind queue appending date-keyed rows to one worksheet
+        worksheet_fn: no-argument callable returning the gspread worksheet
+        (called once, on the worker thread, so authorization happens once)
+    """
+
+    def __init__(self, worksheet_fn, flush_interval=FLUSH_INTERVAL,
+                 max_batch=MAX_BATCH):
+        self.worksheet_fn = worksheet_fn
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._worksheet = None
+        self._written = None   # dates already in the sheet
+        self._pending = {}     # date -> row, later rows replace earlier ones
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.stats = {'enqueued': 0, 'flushes': 0, 'rows_written': 0}
+
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='gsheet-write-behind')
+        self._thread.start()
+
+    def enqueue(self, closing_df):
+        """ Fn to queue the rows of a date-indexed df for appending
+            Return: None (never blocks on the sheet)
+        """
+        rows = {}
+        for day, values in zip(closing_df.index, closing_df.values.tolist()):
+            day = '{:%Y-%m-%d}'.format(day)
+            # the sheets api rejects NaN, send blanks instead
+            rows[day] = [day] + ['' if isinstance(v, float) and
+                                           math.isnan(v) else v
+                                           for v in values]
+
+        with self._cond:
+            self._pending.update(rows)
+            self.stats['enqueued'] += len(rows)
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify()
+
+    def _open(self):
+        """ Fn to open the worksheet once and read the dates already written """
+        if self._worksheet is None:
+            self._worksheet = self.worksheet_fn()
+            self._written = set(self._worksheet.col_values(1)[1:])
+
+    def flush(self):
+        """ Fn to append all pending, not yet written rows in one api call
+            Return: number of rows written
+        """
+        with self._cond:
+            batch, self._pending = self._pending, {}
+
+        if not batch:
+            return 0
+
+        try:
+            self._open()
+            new_dates = sorted(d for d in batch if d not in self._written)
+            if new_dates:
+                self._worksheet.append_rows([batch[d] for d in new_dates])
+                self._written.update(new_dates)
+        except Exception:
+            logger.exception('gsheet append failed, re-queueing %d rows',
+                             len(batch))
+            with self._cond:
+                # keep newer rows enqueued while the flush was running
+                self._pending = {**batch, **self._pending}
+            return 0
+
+        self.stats['flushes'] += 1
+        self.stats['rows_written'] += len(new_dates)
+
+        return len(new_dates)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopped and len(self._pending) < self.max_batch:
+                    self._cond.wait(self.flush_interval)
+                stopped = self._stopped
+
+            self.flush()
+            if stopped:
+                break
+
+    def close(self):
+        """ Fn to flush what is pending and stop the worker """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self._thread.join()
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: indicators.py
+# Description: Technical indicators (SMA / EMA / RSI / MACD / Bollinger)
+#
+# The initial history is computed in vectorized form for all symbols at
+# once. Each symbol also keeps the running state of online (O(1) per new
+# close) versions of the same recurrences, so when the price store appends a
+# trading day the indicators are updated instead of recomputed:
+#   SMA / Bollinger : ring buffer with running sum and sum of squares
+#   EMA / MACD      : ema_t = a * x_t + (1 - a) * ema_t-1 (seeded at x_0)
+#   RSI (Wilder)    : smoothed average gain / loss, alpha = 1 / period
+# If the last synced close changed (prices restated after a split or
+# dividend), the running states are on the old basis and are rebuilt.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+from collections import deque
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+SMA_WINDOW = 20       # also the Bollinger window
+BB_K = 2              # Bollinger band width in standard deviations
+EMA_SPAN = 20
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+RESTATE_RTOL = 1e-4   # relative change of a synced close that means a restatement
+
+INDICATORS = ['sma', 'ema', 'bb_upper', 'bb_lower',
+              'rsi', 'macd', 'macd_signal', 'macd_hist']
+
+
+def _alpha(span):
+    return 2 / (span + 1)
+
+
+#%% Functions - Vectorized (initial history)
+
+def compute_indicators(closing_df):
+    """ Fn to compute every indicator for every column of closing_df
+        Return: df with columns MultiIndex (symbol, indicator)
+    """
+    prices = closing_df.ffill()
+
+    rolling = prices.rolling(SMA_WINDOW)
+    sma = rolling.mean()
+    std = rolling.std(ddof=0)
+
+    def ema(frame, span):
+        return frame.ewm(span=span, adjust=False).mean()
+
+    delta = prices.diff()
+    avg_gain = delta.clip(lower=0).ewm(alpha=1 / RSI_PERIOD, adjust=False).mean()
+    avg_loss = (-delta).clip(lower=0).ewm(alpha=1 / RSI_PERIOD,
+                                          adjust=False).mean()
+
+    macd = ema(prices, MACD_FAST) - ema(prices, MACD_SLOW)
+    macd_signal = ema(macd, MACD_SIGNAL)
+
+    frames = {
+        'sma': sma,
+        'ema': ema(prices, EMA_SPAN),
+        'bb_upper': sma + BB_K * std,
+        'bb_lower': sma - BB_K * std,
+        'rsi': 100 - 100 / (1 + avg_gain / avg_loss),
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_hist': macd - macd_signal,
+    }
+
+    return pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+
+
+#%% Classes - Online (incremental updates)
+
+class OnlineIndicators:
+    """ Running indicator state for one symbol, O(1) per new close """
+
+    def __init__(self):
+        self.window = deque(maxlen=SMA_WINDOW)
+        self.win_sum = 0.0
+        self.win_sumsq = 0.0
+        self.ema = None
+        self.ema_fast = None
+        self.ema_slow = None
+        self.macd_signal = None
+        self.avg_gain = None
+        self.avg_loss = None
+        self.last_price = None
+
+    @classmethod
+    def from_history(cls, prices, history):
+        """ Fn to seed the state from a price series and its vectorized
+            indicators (the last row of `history`)
+            Return: OnlineIndicators
+        """
+        state = cls()
+        prices = prices.ffill().dropna()
+        if len(prices) == 0:
+            return state
+
+        for price in prices.iloc[-SMA_WINDOW:]:
+            state._push(price)
+
+        last = history.iloc[-1]
+        state.ema = last['ema']
+        state.ema_fast = prices.ewm(span=MACD_FAST, adjust=False).mean().iloc[-1]
+        state.ema_slow = prices.ewm(span=MACD_SLOW, adjust=False).mean().iloc[-1]
+        state.macd_signal = last['macd_signal']
+        state.last_price = prices.iloc[-1]
+
+        if len(prices) > 1:
+            delta = prices.diff()
+            state.avg_gain = delta.clip(lower=0).ewm(
+                alpha=1 / RSI_PERIOD, adjust=False).mean().iloc[-1]
+            state.avg_loss = (-delta).clip(lower=0).ewm(
+                alpha=1 / RSI_PERIOD, adjust=False).mean().iloc[-1]
+
+        return state
+
+    def _push(self, price):
+        if len(self.window) == self.window.maxlen:
+            old = self.window[0]
+            self.win_sum -= old
+            self.win_sumsq -= old * old
+        self.window.append(price)
+        self.win_sum += price
+        self.win_sumsq += price * price
+
+    @staticmethod
+    def _ema_step(prev, value, alpha):
+        return value if prev is None else alpha * value + (1 - alpha) * prev
+
+    def update(self, price):
+        """ Fn to add one close (NaN repeats the last close, like ffill)
+            Return: dict of the latest value of every indicator
+        """
+        if price is None or math.isnan(price):
+            price = self.last_price
+        if price is None:
+            return dict.fromkeys(INDICATORS, np.nan)
+
+        self._push(price)
+        if self.last_price is not None:
+            change = price - self.last_price
+            a = 1 / RSI_PERIOD
+            self.avg_gain = self._ema_step(self.avg_gain, max(change, 0.0), a)
+            self.avg_loss = self._ema_step(self.avg_loss, max(-change, 0.0), a)
+        self.last_price = price
+
+        self.ema = self._ema_step(self.ema, price, _alpha(EMA_SPAN))
+        self.ema_fast = self._ema_step(self.ema_fast, price, _alpha(MACD_FAST))
+        self.ema_slow = self._ema_step(self.ema_slow, price, _alpha(MACD_SLOW))
+        macd = self.ema_fast - self.ema_slow
+        self.macd_signal = self._ema_step(self.macd_signal, macd,
+                                          _alpha(MACD_SIGNAL))
+
+        if len(self.window) == SMA_WINDOW:
+            sma = self.win_sum / SMA_WINDOW
+            std = math.sqrt(max(self.win_sumsq / SMA_WINDOW - sma * sma, 0.0))
+        else:
+            sma = std = np.nan
+
+        if self.avg_gain is None:
+            rsi = np.nan
+        elif self.avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+        return {
+            'sma': sma,
+            'ema': self.ema,
+            'bb_upper': sma + BB_K * std,
+            'bb_lower': sma - BB_K * std,
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': self.macd_signal,
+            'macd_hist': macd - self.macd_signal,
+        }
+
+
+class IndicatorBook:
+    """ Indicator history + online state for a universe of symbols
+        sync(closing_df) computes everything once, then only feeds the rows
+        appended after the last synced date through the online states.
+    """
+
+    def __init__(self):
+        self.history = None
+        self.states = {}
+        self._lock = threading.Lock()
+
+    def _rebuild(self, closing_df):
+        self.history = compute_indicators(closing_df)
+        self.states = {symbol: OnlineIndicators.from_history(
+                           closing_df[symbol], self.history[symbol])
+                       for symbol in closing_df.columns}
+
+    def _restated(self, closing_df):
+        """ Fn to check whether closing_df changed the last synced close
+            of any symbol (missing row: treated as changed)
+            Return: bool
+        """
+        last_date = self.history.index[-1]
+        pos = closing_df.index.searchsorted(last_date)
+        if pos == len(closing_df) or closing_df.index[pos] != last_date:
+            return True
+
+        row = closing_df.iloc[pos]
+        for symbol, state in self.states.items():
+            price = row[symbol]
+            if state.last_price is not None and not np.isnan(price) and \
+                    not math.isclose(price, state.last_price,
+                                     rel_tol=RESTATE_RTOL):
+                return True
+
+        return False
+
+    def sync(self, closing_df):
+        """ Fn to bring the indicators up to the last row of closing_df
+            Return: indicator history df (symbol, indicator) over closing_df
+        """
+        with self._lock:
+            if len(closing_df) == 0:
+                return compute_indicators(closing_df)
+
+            if self.history is None or len(self.history) == 0 or \
+                    set(self.states) != set(closing_df.columns) or \
+                    closing_df.index[0] < self.history.index[0] or \
+                    self._restated(closing_df):
+                self._rebuild(closing_df)
+            else:
+                # both indexes are sorted: binary search, not a row mask
+                new_rows = closing_df.iloc[closing_df.index.searchsorted(
+                    self.history.index[-1], side='right'):]
+                if len(new_rows) > 0:
+                    updates = [{(symbol, name): value
+                                for symbol, state in self.states.items()
+                                for name, value in
+                                state.update(row[symbol]).items()}
+                               for _, row in new_rows.iterrows()]
+                    new_history = pd.DataFrame(updates, index=new_rows.index)
+                    self.history = pd.concat([self.history, new_history[
+                                              self.history.columns]])
+
+                # keep the same window as the closing prices
+                self.history = self.history.iloc[
+                    self.history.index.searchsorted(closing_df.index[0]):]
+
+            return self.history
@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: loader_cache.py
+# Description: Bounded, memory-accounted cache for the app's data loaders
+#
+# Replaces the unbounded st.cache_data on the loaders: every entry is sized
+# when it is stored (deep DataFrame memory, array nbytes) and the least
+# recently used entries are evicted once the process-wide byte budget is
+# exceeded, so one entry per day / universe no longer piles up in
+# long-running servers. Hit / miss / eviction counts are kept for the UI.
+# Like st.cache_data, arguments whose name starts with '_' are not part of
+# the key, and the key includes a hash of the loader's source code, so an
+# edited loader does not serve results of its previous version. Entries are
+# stored under the sha256 of the key's repr. Cached values are shared,
+# callers must not modify them.
+# An optional disk tier (SQLite file, DataFrames stored as Parquet bytes,
+# the key's repr kept as text for inspection) is consulted on a memory miss
+# and written on every load; the most recently used entries are loaded back
+# into memory at startup, so a restarted server starts warm.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import functools
+import hashlib
+import inspect
+import io
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+MAX_BYTES = 256 * 2**20        # 256 MB
+DISK_MAX_BYTES = 1024 * 2**20  # 1 GB
+
+logger = logging.getLogger(__name__)
+
+
+#%% Functions
+
+def sizeof(value):
+    """ Fn to estimate the memory held by a cached value
+        (memory-mapped arrays are file-backed and count as 0)
+        Return: int (bytes)
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.memmap):
+        return 0
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+
+    return getattr(value, 'nbytes', sys.getsizeof(value))
+
+
+def _freeze(value):
+    """ Fn to make an argument usable in a cache key """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+
+    return value
+
+
+def code_version(fn):
+    """ Fn to hash the source code of fn (qualified name if unavailable)
+        Return: str (short sha256 hex digest)
+    """
+    try:
+        source = inspect.getsource(fn)
+    except (OSError, TypeError):
+        source = fn.__qualname__
+
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]
+
+
+def key_hash(key):
+    """ Fn to hash a cache key (stable across processes / restarts)
+        Return: str (sha256 hex digest)
+    """
+    return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+
+#%% Classes
+
+class DiskCache:
+    """ SQLite-backed cache of DataFrames (Parquet bytes), bounded by
+        max_bytes with least recently used entries pruned first
+    """
+
+    def __init__(self, path, max_bytes=DISK_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS loader_entries ('
+                         'hash TEXT PRIMARY KEY, key TEXT, value BLOB, '
+                         'nbytes INTEGER, accessed REAL)')
+
+    @contextmanager
+    def _connect(self):
+        # one short-lived connection per call: safe across threads / processes
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # commit / rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, digest):
+        """ Fn to read the df stored under digest (see key_hash)
+            Return: df, else None
+        """
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM loader_entries '
+                               'WHERE hash = ?', (digest,)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE loader_entries SET accessed = ? '
+                         'WHERE hash = ?', (time.time(), digest))
+
+        return pd.read_parquet(io.BytesIO(row[0]))
+
+    def put(self, digest, value, label=''):
+        """ Fn to store a df under digest (other values are not persisted)
+            label: readable form of the key (its repr)
+        """
+        if not isinstance(value, pd.DataFrame):
+            return
+
+        buffer = io.BytesIO()
+        try:
+            value.to_parquet(buffer)
+        except Exception:  # e.g. mixed-type sheet columns
+            logger.warning('not persisting %s: no parquet conversion', label)
+            return
+        blob = buffer.getvalue()
+
+        with self._connect() as conn:
+            conn.execute('INSERT OR REPLACE INTO loader_entries '
+                         'VALUES (?, ?, ?, ?, ?)',
+                         (digest, label, blob, len(blob), time.time()))
+            self._prune(conn)
+
+    def _prune(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(nbytes), 0) '
+                             'FROM loader_entries').fetchone()[0]
+        rows = conn.execute('SELECT hash, nbytes FROM loader_entries '
+                            'ORDER BY accessed').fetchall()
+        for digest, nbytes in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM loader_entries WHERE hash = ?',
+                         (digest,))
+            total -= nbytes
+
+    def recent(self):
+        """ Fn to iterate over the stored entries, most recently used first
+            Return: generator of (digest, df)
+        """
+        with self._connect() as conn:
+            digests = [row[0] for row in conn.execute(
+                'SELECT hash FROM loader_entries ORDER BY accessed DESC')]
+
+        for digest in digests:
+            with self._connect() as conn:
+                row = conn.execute('SELECT value FROM loader_entries '
+                                   'WHERE hash = ?', (digest,)).fetchone()
+            if row is not None:
+                yield digest, pd.read_parquet(io.BytesIO(row[0]))
+
+
+class BoundedCache:
+    """ LRU cache with a global byte budget and hit / miss / eviction stats """
+
+    def __init__(self, max_bytes=MAX_BYTES, disk=None):
+        self.max_bytes = max_bytes
+        self.disk = disk                # optional DiskCache tier
+        self._entries = OrderedDict()   # key digest -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.disk_hits = 0
+
+    def get(self, key, default=None):
+        """ Fn to look up key (counts a hit or a miss)
+            Return: cached value, else default
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """ Fn to store value under key, then evict LRU entries down to
+            max_bytes (a value larger than the whole budget is not stored)
+        """
+        nbytes = sizeof(value)
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+
+    def attach_disk(self, path, max_bytes=DISK_MAX_BYTES):
+        """ Fn to add (once) a disk tier at path and warm the memory tier
+            with its most recently used entries, up to the memory budget
+        """
+        with self._lock:
+            if self.disk is not None and self.disk.path == path:
+                return
+            self.disk = DiskCache(path, max_bytes)
+
+        loaded = 0
+        try:
+            for key, value in self.disk.recent():
+                nbytes = sizeof(value)
+                if loaded + nbytes > self.max_bytes:
+                    break
+                with self._lock:
+                    if key in self._entries:
+                        continue
+                    # oldest entries end up first in line for eviction
+                    self._entries[key] = (value, nbytes)
+                    self._entries.move_to_end(key, last=False)
+                    self._bytes += nbytes
+                loaded += nbytes
+        except Exception:
+            logger.exception('warm load from %s failed', path)
+
+    def resize(self, max_bytes):
+        """ Fn to change the byte budget (evicts right away if it shrank) """
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """ Fn to report the cache counters (misses include disk hits)
+            Return: dict of entries, bytes, max_bytes, hits, misses,
+            evictions, disk_hits
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions,
+                    'disk_hits': self.disk_hits}
+
+    def _disk_get(self, key, default):
+        try:
+            value = self.disk.get(key)
+        except Exception:  # a broken disk tier must not break the loaders
+            logger.exception('disk cache read failed')
+            return default
+        if value is None:
+            return default
+
+        with self._lock:
+            self.disk_hits += 1
+        return value
+
+    def _disk_put(self, key, value, label):
+        try:
+            self.disk.put(key, value, label)
+        except Exception:
+            logger.exception('disk cache write failed')
+
+    def cached(self, fn):
+        """ Decorator caching fn's results under (fn name, fn source hash,
+            key arguments)
+            Return: wrapped function
+        """
+        signature = inspect.signature(fn)
+        version = code_version(fn)
+        key_params = [name for name in signature.parameters
+                      if not name.startswith('_')]
+        missing = object()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key_args = (fn.__qualname__, version) + tuple(
+                _freeze(bound.arguments[name]) for name in key_params)
+            key, label = key_hash(key_args), repr(key_args)
+
+            value = self.get(key, missing)
+            if value is missing and self.disk is not None:
+                value = self._disk_get(key, missing)
+                if value is not missing:
+                    self.put(key, value)
+            if value is missing:
+                value = fn(*args, **kwargs)
+                self.put(key, value)
+                if self.disk is not None:
+                    self._disk_put(key, value, label)
+
+            return value
+
+        return wrapper
+
+
+# process-wide instance shared by all sessions (module is imported once)
+loaders = BoundedCache()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: matrix_store.py
+# Description: Memory-mapped close matrices shared by all server processes
+#
+# A published matrix is two .npy files (dates, values) with a unique name
+# plus a small json manifest per dataset (name, version, symbols, files).
+# Readers map the files read-only (np.load mmap_mode='r'), so every
+# Streamlit process on the node shares the same page cache pages instead of
+# holding its own copy. Refreshes write new files and swap the manifest with
+# os.replace; readers of the previous generation keep their (still valid)
+# mapping, generations older than that are removed.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+from datetime import datetime as dt
+import glob
+import json
+import os
+import threading
+import uuid
+
+import numpy as np
+
+from close_matrix import CloseMatrix
+
+
+STORE_DIR = './data/matrix_store'
+
+
+#%% Functions - Manifest
+
+def _manifest_path(name, store_dir):
+    return os.path.join(store_dir, '{}.json'.format(name))
+
+
+def version_tag(*parts):
+    """ Fn to turn the parts of a data version into a manifest string """
+    return '|'.join(str(part) for part in parts)
+
+
+def read_manifest(name, store_dir=STORE_DIR):
+    """ Fn to read the manifest of a published matrix
+        Return: dict (version, dates, values, symbols, written_at) or None
+    """
+    try:
+        with open(_manifest_path(name, store_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+#%% Functions - Publish / open
+
+def open_matrix(name, version=None, store_dir=STORE_DIR):
+    """ Fn to map the published matrix read-only
+        version: required version tag (None: whatever is published)
+        Return: close_matrix.CloseMatrix backed by memory maps, or None
+    """
+    manifest = read_manifest(name, store_dir)
+    if manifest is None or \
+            (version is not None and manifest['version'] != version):
+        return None
+
+    try:
+        dates = np.load(os.path.join(store_dir, manifest['dates']),
+                        mmap_mode='r')
+        values = np.load(os.path.join(store_dir, manifest['values']),
+                         mmap_mode='r')
+    except OSError:  # swapped and cleaned up between manifest read and open
+        return None
+
+    return CloseMatrix(dates, values, manifest['symbols'], copy=False)
+
+
+def publish(name, matrix, version, store_dir=STORE_DIR):
+    """ Fn to write a matrix for all processes and swap it in atomically
+        Return: close_matrix.CloseMatrix mapped from the published files
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    token = '{}-{}'.format(name, uuid.uuid4().hex[:12])
+    files = {'dates': token + '-dates.npy', 'values': token + '-values.npy'}
+
+    np.save(os.path.join(store_dir, files['dates']), matrix.dates)
+    np.save(os.path.join(store_dir, files['values']), matrix.values)
+
+    previous = read_manifest(name, store_dir)
+    manifest = dict(files, version=version, symbols=matrix.symbols,
+                    written_at=dt.now().isoformat(timespec='seconds'))
+
+    path = _manifest_path(name, store_dir)
+    # unique per process and thread: concurrent publishers never share it
+    tmp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+    _cleanup(name, store_dir, keep=[manifest, previous])
+
+    return open_matrix(name, version, store_dir) or matrix
+
+
+def _cleanup(name, store_dir, keep):
+    """ Fn to delete the data files of older generations """
+    kept = {entry[key] for entry in keep if entry
+            for key in ('dates', 'values')}
+
+    for path in glob.glob(os.path.join(store_dir, name + '-*.npy')):
+        if os.path.basename(path) not in kept:
+            try:
+                os.remove(path)
+            except OSError:  # still mapped (Windows) - next publish retries
+                pass
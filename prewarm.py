@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: prewarm.py
+# Description: Background cache pre-warmer for the YFinance app
+#
+# A daemon thread sleeps until the next session's closes are final and then
+# runs the refresh jobs (the cached loaders for the new session key). A cache
+# entry only appears once its loader has returned, so users either hit the
+# previous session's entry or the complete new one - never a partial fetch.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+import logging
+import threading
+import time
+
+import trading_calendar
+
+
+REFRESH_MARGIN = 5 # seconds past the refresh point before running the jobs
+
+logger = logging.getLogger(__name__)
+
+
+#%% Classes
+
+class PreWarmer(threading.Thread):
+    """ Daemon thread that runs jobs shortly after every market close
+        jobs: list of no-argument callables
+        wait_fn: returns the seconds to sleep until the next refresh
+    """
+
+    def __init__(self, jobs, wait_fn=trading_calendar.seconds_until_refresh):
+        super().__init__(name='cache-prewarmer', daemon=True)
+        self.jobs = jobs
+        self.wait_fn = wait_fn
+        self.last_run = None
+        self._stop_event = threading.Event()
+
+    def run_jobs(self):
+        """ Fn to run every job once, logging (not raising) failures """
+        for job in self.jobs:
+            try:
+                job()
+            except Exception:
+                logger.exception('pre-warm job %r failed', job)
+
+        self.last_run = time.time()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            # sleep past the refresh point so the new session key is current
+            if self._stop_event.wait(self.wait_fn() + REFRESH_MARGIN):
+                break
+            self.run_jobs()
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: price_store.py
+# Description: Incremental on-disk closing price store for the YFinance app
+#
+# Closing prices are kept as one Parquet file per ticker under STORE_DIR.
+# A small json manifest records how far each ticker has been fetched so that
+# only the missing tail (usually the last trading day) is downloaded.
+# Each tail fetch starts one stored close early: if upstream no longer
+# agrees on that overlap close (adjusted prices are restated after a split /
+# dividend), the ticker's whole window is re-fetched and its file rewritten,
+# so a stored history never mixes two adjustment bases.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+from datetime import date, timedelta
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import trading_calendar
+
+
+STORE_DIR = './data/price_store/'
+MANIFEST_FILE = '_manifest.json'
+OVERLAP_RTOL = 1e-4  # relative change of the overlap close that means a restatement
+
+
+#%% Functions - Read / Write store
+
+def _ticker_path(store_dir, ticker):
+    return os.path.join(store_dir, '{}.parquet'.format(ticker))
+
+
+def _atomic_replace(path, write_fn):
+    """ Fn to write a file via a temp file and os.replace (no torn reads)
+    """
+    # unique per process / thread: concurrent servers share the store
+    tmp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+    write_fn(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(store_dir=STORE_DIR):
+    """ Fn to read the fetch manifest
+        Return: dict of ticker -> last date (datetime.date) already fetched
+    """
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, 'r') as f:
+        raw = json.load(f)
+
+    return {ticker: date.fromisoformat(d) for ticker, d in raw.items()}
+
+
+def write_manifest(manifest, store_dir=STORE_DIR):
+    """ Fn to write the fetch manifest """
+    os.makedirs(store_dir, exist_ok=True)
+    raw = {ticker: d.isoformat() for ticker, d in manifest.items()}
+
+    def _write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(raw, f, indent=1, sort_keys=True)
+
+    _atomic_replace(os.path.join(store_dir, MANIFEST_FILE), _write)
+
+
+def read_ticker(ticker, store_dir=STORE_DIR):
+    """ Fn to read the stored closing prices for one ticker
+        Return: closing price series with a DatetimeIndex (empty if none)
+    """
+    path = _ticker_path(store_dir, ticker)
+    if not os.path.exists(path):
+        return pd.Series(index=pd.DatetimeIndex([]), dtype='float64',
+                         name=ticker)
+
+    series = pd.read_parquet(path)['Close']
+    series.name = ticker
+
+    return series
+
+
+def write_ticker(ticker, series, store_dir=STORE_DIR):
+    """ Fn to (over)write the stored closing prices for one ticker """
+    os.makedirs(store_dir, exist_ok=True)
+    frame = series.rename('Close').to_frame()
+
+    _atomic_replace(_ticker_path(store_dir, ticker), frame.to_parquet)
+
+
+def _window(stored, start_date, end_date):
+    """ Fn to align stored series and cut them to [start_date, end_date) """
+    closing_df = pd.DataFrame(stored)
+    return closing_df[(closing_df.index >= pd.Timestamp(start_date)) &
+                      (closing_df.index < pd.Timestamp(end_date))]
+
+
+def read_closing(tickers, start_date, end_date, store_dir=STORE_DIR):
+    """ Fn to read stored closes without fetching anything
+        Return: closing_df (df) for [start_date, end_date), may be incomplete
+    """
+    stored = {ticker: read_ticker(ticker, store_dir) for ticker in tickers}
+
+    return _window(stored, start_date, end_date)
+
+
+#%% Functions - Incremental update
+
+def fetch_start(series, fetched_until, start_date):
+    """ Fn to work out the first date that still has to be fetched
+        Return: datetime.date
+    """
+    # nothing stored, or stored history does not reach back far enough
+    if len(series) == 0 or series.index.min().date() > start_date:
+        return start_date
+
+    last_date = series.index.max().date()
+    if fetched_until is not None and fetched_until > last_date:
+        last_date = fetched_until
+
+    return last_date + timedelta(days=1)
+
+
+def restated(series, new_series):
+    """ Fn to check whether upstream restated a ticker's stored closes
+        (the overlap close, i.e. the last stored one, no longer matches)
+        Return: bool
+    """
+    if len(series) == 0 or series.index[-1] not in new_series.index:
+        return False
+
+    return not np.isclose(new_series[series.index[-1]], series.iloc[-1],
+                          rtol=OVERLAP_RTOL)
+
+
+def update_store(tickers, start_date, end_date, fetch_fn, store_dir=STORE_DIR):
+    """ Fn to bring the store up to end_date (exclusive) and return closes
+        fetch_fn(tickers, start, end) must return a wide df of closing prices
+        (DatetimeIndex x tickers), e.g. yf.download(...).xs('Close', ...).
+        Tickers sharing the same missing tail are fetched in one request,
+        starting at their last stored close (overlap row). A ticker is only
+        marked fetched if it came back in the result (None: nothing new).
+        Return: closing_df (df) for [start_date, end_date), raises ValueError
+        if fetch_fn returns nothing although new sessions were due
+    """
+    manifest = read_manifest(store_dir)
+    stored = {ticker: read_ticker(ticker, store_dir) for ticker in tickers}
+
+    # group tickers by the first date to request -> one download per group
+    groups = {}
+    for ticker, series in stored.items():
+        from_date = fetch_start(series, manifest.get(ticker), start_date)
+        if from_date < end_date:
+            if from_date > start_date and len(series) > 0:
+                from_date = series.index[-1].date()  # overlap row
+            groups.setdefault(from_date, []).append(ticker)
+
+    rewrite = []
+    for from_date, group in groups.items():
+        new_df = fetch_fn(group, from_date, end_date)
+
+        # an empty answer is only valid if no session is due (weekend tail)
+        first_new = from_date + timedelta(days=1) \
+            if from_date > start_date else from_date
+        if (new_df is None or new_df.empty) and \
+                len(trading_calendar.sessions_between(first_new, end_date)):
+            raise ValueError('no closing prices for {} tickers from {}'
+                             .format(len(group), from_date))
+
+        for ticker in group:
+            if new_df is not None and ticker in new_df.columns:
+                new_series = new_df[ticker].dropna()
+            elif new_df is not None:
+                # missing from a partial result (failed batch) - retry later
+                continue
+            else:
+                new_series = stored[ticker].iloc[:0]
+
+            if len(new_series) == 0 and new_df is not None and \
+                    new_df.notna().any().any():
+                continue  # no rows while other tickers got some - retry later
+
+            if restated(stored[ticker], new_series):
+                rewrite.append(ticker)
+                continue
+
+            if len(new_series) > 0:
+                merged = pd.concat([stored[ticker], new_series])
+                merged = merged[~merged.index.duplicated(keep='last')]
+                stored[ticker] = merged.sort_index()
+                write_ticker(ticker, stored[ticker], store_dir)
+
+            # record the fetch even when it returned no rows (weekend/holiday)
+            manifest[ticker] = end_date - timedelta(days=1)
+
+    # adjustment basis changed upstream: replace the whole stored window
+    if rewrite:
+        new_df = fetch_fn(rewrite, start_date, end_date)
+        for ticker in rewrite:
+            if new_df is None or ticker not in new_df.columns or \
+                    new_df[ticker].notna().sum() == 0:
+                continue  # keep the old file, next refresh tries again
+
+            stored[ticker] = new_df[ticker].dropna().sort_index()
+            write_ticker(ticker, stored[ticker], store_dir)
+            manifest[ticker] = end_date - timedelta(days=1)
+
+    if groups:
+        write_manifest(manifest, store_dir)
+
+    return _window(stored, start_date, end_date)
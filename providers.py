@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: providers.py
+# Description: Pluggable price providers for the YFinance app
+#
+# Every provider serves two kinds of data in the shapes app.py expects:
+#   fetch_closing(tickers, start, end) -> wide closes (DatetimeIndex x tickers)
+#   read_history()                     -> wide history with a 'Date' column
+# 'local' and 'synthetic' need no network and take an artificial latency so
+# the dashboard can be benchmarked in isolation from upstream response times.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+from datetime import timedelta
+import functools
+import time
+
+import numpy as np
+import pandas as pd
+
+import fetch_engine
+import trading_calendar
+
+
+FILE_DIR = './data/' # base folder is the current directory
+
+CLOSING_PATH = FILE_DIR + 'yf_closing_2021.csv'
+NSTOCKS_PATH = FILE_DIR + 'nasdaq_stocks_2010-22.csv'
+
+
+#%% Helpers
+
+def _read_table(path1):
+    """ Fn to read a csv or parquet file (by extension) into a df """
+    if path1.endswith('.parquet'):
+        return pd.read_parquet(path1)
+
+    return pd.read_csv(path1)
+
+
+def _date_window(closing_df1, start_date1, end_date1):
+    """ Fn to filter a DatetimeIndex df to [start_date1, end_date1) """
+    return closing_df1[(closing_df1.index >= pd.Timestamp(start_date1)) &
+                       (closing_df1.index < pd.Timestamp(end_date1))]
+
+
+def _expects_rows(start_date1, end_date1):
+    """ Fn to check for sessions in [start_date1, end_date1) after
+        start_date1 (the overlap row of a tail fetch)
+    """
+    first_new = pd.Timestamp(start_date1) + pd.Timedelta(days=1)
+
+    return len(trading_calendar.sessions_between(first_new, end_date1)) > 0
+
+
+#%% Providers
+
+class PriceProvider:
+    """ Base class for price providers
+        persistent: True if results should go through the local price store
+        has_history: False if read_history is not supported
+        request_fn: optional wrapper for each upstream request, e.g. a
+        circuit breaker's request() (per-request timeout)
+    """
+    name = None
+    persistent = False
+    has_history = True
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.request_fn = None
+
+    def _request(self, fn, *args, **kwargs):
+        """ Fn to make one upstream request (through request_fn if set) """
+        if self.request_fn is None:
+            return fn(*args, **kwargs)
+
+        return self.request_fn(fn, *args, **kwargs)
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def fetch_closing(self, tickers, start_date, end_date):
+        raise NotImplementedError
+
+    def read_history(self):
+        raise NotImplementedError
+
+
+class YFinanceProvider(PriceProvider):
+    """ Closing prices from the YFinance feed
+        per_ticker: use the asyncio fetch engine (one history request per
+        ticker, max_concurrency at a time) instead of a single yf.download
+        chunk_size: universes larger than this are bulk downloaded in
+        parallel batches of chunk_size tickers (chunk_workers at a time)
+    """
+    name = 'yfinance'
+    persistent = True
+    has_history = False
+
+    def __init__(self, latency=0.0, per_ticker=False,
+                 max_concurrency=fetch_engine.MAX_CONCURRENCY,
+                 chunk_size=fetch_engine.CHUNK_SIZE,
+                 chunk_workers=fetch_engine.CHUNK_WORKERS):
+        super().__init__(latency)
+        self.per_ticker = per_ticker
+        self.max_concurrency = max_concurrency
+        self.chunk_size = chunk_size
+        self.chunk_workers = chunk_workers
+
+    def fetch_closing(self, tickers, start_date, end_date):
+        # the request timeout applies per ticker / per batch
+        if self.per_ticker:
+            closing_df = fetch_engine.fetch_closing_matrix(
+                tickers, start_date, end_date,
+                history_fn=functools.partial(self._request,
+                                             fetch_engine.yf_ticker_close),
+                max_concurrency=self.max_concurrency)
+            if closing_df is None and _expects_rows(start_date, end_date):
+                raise ValueError('yfinance returned no history for {} tickers '
+                                 'from {}'.format(len(tickers), start_date))
+            return closing_df
+
+        if len(tickers) > self.chunk_size:
+            return fetch_engine.fetch_chunked(
+                list(tickers), start_date, end_date,
+                functools.partial(self._request, self._download),
+                chunk_size=self.chunk_size, max_workers=self.chunk_workers)
+
+        return self._request(self._download, tickers, start_date, end_date)
+
+    def _download(self, tickers, start_date, end_date):
+        """ Fn to bulk download closing prices with one yf.download call """
+        import yfinance as yf
+
+        yf_df = yf.download(
+            tickers=tickers,
+            threads=True,      # built-in multithreading
+            start=start_date,
+            end=end_date,
+            auto_adjust=True)  # auto-adjusted prices
+
+        # yf.download logs a throttled / failed request and returns an empty
+        # frame: only a tail without new sessions (weekend, holiday) is empty
+        if yf_df.empty:
+            if _expects_rows(start_date, end_date):
+                raise ValueError('yfinance returned no prices for {} tickers '
+                                 'from {}'.format(len(tickers), start_date))
+            return None
+
+        # filter for column level Price = 'Close'
+        return yf_df.xs('Close', axis=1, level='Price')
+
+    def read_history(self):
+        raise NotImplementedError('yfinance provider has no historical sheet')
+
+
+class GSheetsProvider(PriceProvider):
+    """ Prices from a private google sheets worksheet (streamlit_gsheets) """
+    name = 'gsheets'
+
+    def __init__(self, conn, spreadsheet, worksheet, latency=0.0):
+        super().__init__(latency)
+        self.conn = conn
+        self.spreadsheet = spreadsheet
+        self.worksheet = worksheet
+
+    def read_history(self):
+        self._wait()
+        return self._request(self.conn.read, spreadsheet=self.spreadsheet,
+                             worksheet=self.worksheet)
+
+    def fetch_closing(self, tickers, start_date, end_date):
+        sheet_df = self.read_history()
+        sheet_df = sheet_df.set_index(pd.to_datetime(sheet_df['Date']))
+
+        return _date_window(sheet_df[list(tickers)], start_date, end_date)
+
+
+class LocalFileProvider(PriceProvider):
+    """ Deterministic offline provider serving csv / parquet files in data/
+        rebase: shift the closing fixture by whole weeks so that its last row
+        lands just before the requested end date (weekdays are preserved)
+    """
+    name = 'local'
+
+    def __init__(self, closing_path=CLOSING_PATH, history_path=NSTOCKS_PATH,
+                 latency=0.0, rebase=True):
+        super().__init__(latency)
+        self.closing_path = closing_path
+        self.history_path = history_path
+        self.rebase = rebase
+
+    def fetch_closing(self, tickers, start_date, end_date):
+        self._wait()
+        closing_df = _read_table(self.closing_path)
+        date_col = closing_df.columns[0]
+        closing_df = closing_df.set_index(pd.to_datetime(closing_df[date_col]))
+
+        if self.rebase:
+            days_behind = (pd.Timestamp(end_date) - timedelta(days=1) -
+                           closing_df.index.max()).days
+            closing_df.index += pd.Timedelta(weeks=days_behind // 7)
+
+        tickers = [t for t in tickers if t in closing_df.columns]
+
+        return _date_window(closing_df[tickers], start_date, end_date)
+
+    def read_history(self):
+        self._wait()
+        history_df = _read_table(self.history_path)
+
+        # match the gsheets layout: first column is 'Date'
+        return history_df.rename(columns={history_df.columns[0]: 'Date'})
+
+
+class SyntheticProvider(PriceProvider):
+    """ Seeded random-walk prices on business days (any universe size) """
+    name = 'synthetic'
+
+    def __init__(self, seed=0, latency=0.0):
+        super().__init__(latency)
+        self.seed = seed
+
+    def _random_walk(self, tickers, dates):
+        prices = {}
+        for ticker in tickers:
+            # per-ticker seed keeps a ticker's series stable across universes
+            rng = np.random.default_rng([self.seed, sum(map(ord, ticker))])
+            log_ret = rng.normal(0.0003, 0.02, size=len(dates))
+            prices[ticker] = 100 * np.exp(np.cumsum(log_ret))
+
+        return pd.DataFrame(prices, index=dates)
+
+    def fetch_closing(self, tickers, start_date, end_date):
+        self._wait()
+        dates = pd.bdate_range(start_date, pd.Timestamp(end_date) -
+                               timedelta(days=1))
+
+        return self._random_walk(tickers, dates)
+
+    def read_history(self):
+        self._wait()
+        dates = pd.date_range('2010-01-01', '2022-01-01', freq='MS')
+        history_df = self._random_walk(['AAPL', 'AMZN', 'GOOG',
+                                        'MSFT', 'NFLX', 'TSLA'], dates)
+        history_df.index.name = 'Date'
+
+        return history_df.reset_index()
+
+
+PROVIDERS = {
+    'yfinance': YFinanceProvider,
+    'gsheets': GSheetsProvider,
+    'local': LocalFileProvider,
+    'synthetic': SyntheticProvider,
+}
+
+
+def get_provider(name, history=False, **kwargs):
+    """ Fn to construct a price provider by name (see PROVIDERS)
+        history: the provider will serve the historical prices (read_history)
+        Return: PriceProvider instance
+    """
+    if name not in PROVIDERS:
+        raise ValueError('Unknown price provider {!r}, choose one of: {}'
+                         .format(name, ', '.join(PROVIDERS)))
+
+    if history and not PROVIDERS[name].has_history:
+        raise ValueError('Price provider {!r} has no historical prices, '
+                         'choose one of: {}'.format(name, ', '.join(
+                             n for n, cls in PROVIDERS.items()
+                             if cls.has_history)))
+
+    return PROVIDERS[name](**kwargs)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: range_index.py
+# Description: Precomputed range indexes over the closing price block
+#
+# ReturnIndex keeps the cumulative log price of every symbol (log of the
+# forward filled close), so the return between any two sessions is
+# exp(cum[j] - cum[i]) - 1: two array lookups after a binary search of the
+# start / end dates, whatever the length of the range.
+# RangeMinMax is a sparse table of the column-wise min / max over every
+# power-of-two run of sessions, so the high / low over any range is the
+# min / max of two overlapping runs.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+import numpy as np
+import pandas as pd
+
+from analytics import TRADING_DAYS
+from close_matrix import ffill_block
+
+
+#%% Functions
+
+def to_day_array(dates):
+    """ Fn to convert dates (index / list of date, Timestamp, str) to a
+        datetime64[D] array
+        Return: np.ndarray
+    """
+    return pd.to_datetime(pd.Index(dates)).to_numpy(dtype='datetime64[D]') \
+        if len(dates) else np.array([], dtype='datetime64[D]')
+
+
+#%% Classes
+
+class _SessionIndex:
+    """ Sorted session dates + symbol -> column map of a close block """
+
+    def __init__(self, dates, symbols):
+        self.dates = to_day_array(dates)
+        self.symbols = list(symbols)
+        self.columns = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def from_frame(cls, closing_df):
+        """ Fn to build the index from closing_df (dates x symbols)
+            Return: index instance
+        """
+        return cls(closing_df.index, closing_df.to_numpy(dtype='float64'),
+                   closing_df.columns)
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """ Fn to build the index straight from a close_matrix.CloseMatrix
+            Return: index instance
+        """
+        return cls(matrix.dates, matrix.values, matrix.symbols)
+
+    def bounds(self, start, end):
+        """ Fn to find the first / last session rows within [start, end]
+            Return: (i, j) row positions, i > j if the range is empty
+        """
+        start = np.datetime64(start, 'D')
+        end = np.datetime64(end, 'D')
+        i = np.searchsorted(self.dates, start, side='left')
+        j = np.searchsorted(self.dates, end, side='right') - 1
+
+        return int(i), int(j)
+
+
+class ReturnIndex(_SessionIndex):
+    """ Cumulative log prices of a (dates x symbols) close block,
+        O(1) return / annualized return over any [start, end] range
+    """
+
+    def __init__(self, dates, prices, symbols):
+        super().__init__(dates, symbols)
+
+        prices = ffill_block(np.asarray(prices, dtype='float64'))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.cum_log = np.log(prices)
+
+    @property
+    def nbytes(self):
+        return self.cum_log.nbytes + self.dates.nbytes
+
+    def _log_return(self, i, j, symbol=None):
+        if i > j:
+            return np.nan if symbol is not None else \
+                np.full(len(self.symbols), np.nan)
+        if symbol is None:
+            return self.cum_log[j] - self.cum_log[i]
+
+        col = self.columns[symbol]
+        return self.cum_log[j, col] - self.cum_log[i, col]
+
+    def range_return(self, start, end, symbol=None):
+        """ Fn to get the simple return over [start, end]
+            Return: float for a symbol, else np.ndarray over all symbols
+        """
+        i, j = self.bounds(start, end)
+
+        return np.expm1(self._log_return(i, j, symbol))
+
+    def annualized_return(self, start, end, symbol=None):
+        """ Fn to get the annualized return over [start, end]
+            (compounded over the trading sessions in the range)
+            Return: float for a symbol, else np.ndarray over all symbols
+        """
+        i, j = self.bounds(start, end)
+        sessions = max(j - i, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.expm1(self._log_return(i, j, symbol) * TRADING_DAYS /
+                            sessions)
+
+    def range_returns(self, starts, ends):
+        """ Fn to get the simple returns of many ranges at once
+            Return: np.ndarray (ranges x symbols), NaN for empty ranges
+        """
+        i = np.searchsorted(self.dates, to_day_array(starts), side='left')
+        j = np.searchsorted(self.dates, to_day_array(ends), side='right') - 1
+        if len(self.dates) == 0:
+            return np.full((len(i), len(self.symbols)), np.nan)
+        empty = (i > j) | (j < 0) | (i >= len(self.dates))
+
+        i = np.clip(i, 0, len(self.dates) - 1)
+        j = np.clip(j, 0, len(self.dates) - 1)
+        log_ret = self.cum_log[j] - self.cum_log[i]
+        log_ret[empty] = np.nan
+
+        return np.expm1(log_ret)
+
+    def leaderboard(self, start, end):
+        """ Fn to rank all symbols by their return over [start, end]
+            Return: df indexed by symbol: return, annualized (best first)
+        """
+        board = pd.DataFrame({
+            'return': self.range_return(start, end),
+            'annualized': self.annualized_return(start, end),
+        }, index=pd.Index(self.symbols, name='symbol'))
+
+        return board.sort_values('return', ascending=False)
+
+
+class RangeMinMax(_SessionIndex):
+    """ Sparse tables of a (dates x symbols) close block,
+        O(1) high / low over any [start, end] range (NaNs are skipped)
+    """
+
+    def __init__(self, dates, prices, symbols):
+        super().__init__(dates, symbols)
+
+        prices = np.asarray(prices, dtype='float64')
+        # level k: min / max over the 2**k sessions starting at each row
+        self.mins, self.maxs = [prices], [prices]
+        width = 1
+        while 2 * width <= len(prices):
+            self.mins.append(np.fmin(self.mins[-1][:-width],
+                                     self.mins[-1][width:]))
+            self.maxs.append(np.fmax(self.maxs[-1][:-width],
+                                     self.maxs[-1][width:]))
+            width *= 2
+
+    @property
+    def nbytes(self):
+        # level 0 is the prices block itself (shared by mins / maxs)
+        return sum(level.nbytes for level in self.mins + self.maxs[1:]) + \
+            self.dates.nbytes
+
+    def _query(self, tables, combine, start, end, symbol):
+        i, j = self.bounds(start, end)
+        if i > j:
+            return np.nan if symbol is not None else \
+                np.full(len(self.symbols), np.nan)
+
+        k = (j - i + 1).bit_length() - 1
+        col = slice(None) if symbol is None else self.columns[symbol]
+
+        return combine(tables[k][i, col], tables[k][j - (1 << k) + 1, col])
+
+    def high(self, start, end, symbol=None):
+        """ Fn to get the highest close over [start, end]
+            Return: float for a symbol, else np.ndarray over all symbols
+        """
+        return self._query(self.maxs, np.fmax, start, end, symbol)
+
+    def low(self, start, end, symbol=None):
+        """ Fn to get the lowest close over [start, end]
+            Return: float for a symbol, else np.ndarray over all symbols
+        """
+        return self._query(self.mins, np.fmin, start, end, symbol)
+
+    def domain(self, start, end, symbol, pad=0.02):
+        """ Fn to get a tight y-axis domain for a symbol over [start, end]
+            (low / high widened by pad of the range on each side)
+            Return: (low, high) tuple, None if no prices in the range
+        """
+        low = self.low(start, end, symbol)
+        high = self.high(start, end, symbol)
+        if np.isnan(low) or np.isnan(high):
+            return None
+
+        margin = (high - low) * pad or abs(high) * pad
+
+        return (float(low - margin), float(high + margin))
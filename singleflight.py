@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: singleflight.py
+# Description: Single-flight request coalescing for concurrent sessions
+#
+# Streamlit runs each session's script in its own thread. When the daily
+# cache rolls over, all sessions miss st.cache_data at once; the first caller
+# for a key runs the fetch and every concurrent caller with the same key
+# waits for it and shares its result (or its exception).
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+import threading
+
+
+#%% Classes
+
+class _Call:
+    """ One in-flight call and its outcome """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """ Coalesce concurrent calls with the same key into one execution """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """ Fn to run fn(*args, **kwargs) once per in-flight key
+            Return: fn's result (shared by all callers waiting on key)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+
+# process-wide instance shared by all sessions (module is imported once)
+flight = SingleFlight()
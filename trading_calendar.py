@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+# =============================================================================
+# Created on 2026-10-17
+# Script Name: trading_calendar.py
+# Description: NYSE / NASDAQ trading calendar for the YFinance app
+#
+# Sessions are weekdays that are not exchange holidays. Holidays follow the
+# NYSE rules (Saturday holidays observed on Friday, Sunday on Monday, except
+# New Year's Day on a Saturday which is not observed). Unscheduled closures
+# (national days of mourning, 9/11, Hurricane Sandy) are listed explicitly in
+# SPECIAL_CLOSURES and must be added there when the exchange announces one.
+# Early closes are treated as full sessions.
+#
+# The session table is generated offline from these rules into SESSIONS_FILE
+# (python trading_calendar.py) and loaded as a sorted datetime64[D] array, so
+# session lookups are binary searches instead of per-day rule evaluation.
+# @author: 18HIAGC
+# =============================================================================
+
+#%% Imports
+
+from datetime import date, datetime, time, timedelta
+import os
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_CLOSE = time(16, 0)
+
+# wait after the close before treating the session's prices as final
+REFRESH_DELAY = timedelta(minutes=30)
+
+SESSIONS_FILE = './data/nyse_sessions.csv'
+SESSIONS_START_YEAR = 2000
+SESSIONS_END_YEAR = 2040
+
+# unscheduled full-day NYSE closures (not derivable from the holiday rules)
+SPECIAL_CLOSURES = {
+    date(2001, 9, 11), date(2001, 9, 12),       # September 11 attacks
+    date(2001, 9, 13), date(2001, 9, 14),
+    date(2004, 6, 11),                          # mourning: Ronald Reagan
+    date(2007, 1, 2),                           # mourning: Gerald Ford
+    date(2012, 10, 29), date(2012, 10, 30),     # Hurricane Sandy
+    date(2018, 12, 5),                          # mourning: George H. W. Bush
+    date(2025, 1, 9),                           # mourning: Jimmy Carter
+}
+
+
+#%% Functions - Holiday rules
+
+def _nth_weekday(year, month, weekday, n):
+    """ Fn to find the n-th weekday (Mon=0) of a month, n=-1 for the last """
+    if n > 0:
+        first = date(year, month, 1)
+        offset = (weekday - first.weekday()) % 7
+        return first + timedelta(days=offset + 7 * (n - 1))
+
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter_sunday(year):
+    """ Fn to compute Easter Sunday (anonymous Gregorian algorithm) """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+
+    return date(year, month, day + 1)
+
+
+def _observed(holiday):
+    """ Fn to move a weekend holiday to the weekday it is observed on """
+    if holiday.weekday() == 5:
+        return holiday - timedelta(days=1)
+    if holiday.weekday() == 6:
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+def nyse_holidays(year):
+    """ Fn to list the NYSE full-day holidays of a year (special closures
+        included)
+        Return: set of datetime.date
+    """
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),                    # Martin Luther King Jr.
+        _nth_weekday(year, 2, 0, 3),                    # Washington's Birthday
+        _easter_sunday(year) - timedelta(days=2),       # Good Friday
+        _nth_weekday(year, 5, 0, -1),                   # Memorial Day
+        _observed(date(year, 7, 4)),                    # Independence Day
+        _nth_weekday(year, 9, 0, 1),                    # Labor Day
+        _nth_weekday(year, 11, 3, 4),                   # Thanksgiving
+        _observed(date(year, 12, 25)),                  # Christmas
+    }
+
+    # New Year's Day: a Saturday holiday is not moved into the old year
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:
+        holidays.add(_observed(new_year))
+
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))      # Juneteenth
+
+    holidays.update(day for day in SPECIAL_CLOSURES if day.year == year)
+
+    return holidays
+
+
+#%% Functions - Session table (generated offline from the rules above)
+
+def generate_sessions(start_year=SESSIONS_START_YEAR,
+                      end_year=SESSIONS_END_YEAR):
+    """ Fn to list every session from start_year to end_year (inclusive)
+        Return: list of datetime.date
+    """
+    sessions = []
+    for year in range(start_year, end_year + 1):
+        holidays = nyse_holidays(year)
+        day = date(year, 1, 1)
+        while day.year == year:
+            if day.weekday() < 5 and day not in holidays:
+                sessions.append(day)
+            day += timedelta(days=1)
+
+    return sessions
+
+
+def write_sessions_file(path=SESSIONS_FILE):
+    """ Fn to (re)generate the precomputed session table csv """
+    with open(path, 'w') as f:
+        f.write('date\n')
+        f.writelines('{}\n'.format(d.isoformat()) for d in generate_sessions())
+
+
+def load_sessions(path=SESSIONS_FILE):
+    """ Fn to load the session table (generated in memory if the file is missing)
+        Return: sorted np.ndarray of datetime64[D]
+    """
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            days = f.read().split()[1:]
+    else:
+        days = [d.isoformat() for d in generate_sessions()]
+
+    return np.array(days, dtype='datetime64[D]')
+
+
+SESSIONS = load_sessions()
+
+
+#%% Functions - Sessions
+
+def _position(day):
+    """ Fn to binary search a date in SESSIONS
+        Return: index of the first session >= day
+    """
+    day = np.datetime64(day, 'D')
+    if day < SESSIONS[0] or day > SESSIONS[-1]:
+        raise ValueError('{} is outside the session table ({} to {})'
+                         .format(day, SESSIONS[0], SESSIONS[-1]))
+
+    return int(np.searchsorted(SESSIONS, day, side='left'))
+
+
+def _session_date(idx):
+    return SESSIONS[idx].astype(object)
+
+
+def is_session(day):
+    """ Fn to check whether a date is a trading session """
+    idx = _position(day)
+    return idx < len(SESSIONS) and SESSIONS[idx] == np.datetime64(day, 'D')
+
+
+def previous_session(day):
+    """ Fn to find the last session strictly before day """
+    return _session_date(_position(day) - 1)
+
+
+def next_session(day):
+    """ Fn to find the first session strictly after day """
+    idx = _position(day)
+    if is_session(day):
+        idx += 1
+    return _session_date(idx)
+
+
+def sessions_back(day, n_sessions):
+    """ Fn to step n_sessions sessions back from the last session <= day
+        Return: datetime.date
+    """
+    idx = _position(day)
+    if not is_session(day):
+        idx -= 1
+    return _session_date(idx - n_sessions)
+
+
+def sessions_between(start_date, end_date):
+    """ Fn to get the sessions in [start_date, end_date)
+        Return: np.ndarray of datetime64[D] (a view of SESSIONS)
+    """
+    lo = int(np.searchsorted(SESSIONS, np.datetime64(start_date, 'D')))
+    hi = int(np.searchsorted(SESSIONS, np.datetime64(end_date, 'D')))
+    return SESSIONS[lo:hi]
+
+
+def _refresh_time(session):
+    """ Fn to get the (tz-aware) time a session's closes become final """
+    return datetime.combine(session, MARKET_CLOSE, MARKET_TZ) + REFRESH_DELAY
+
+
+def last_completed_session(now=None):
+    """ Fn to find the latest session whose closing prices are final
+        Return: datetime.date
+    """
+    now = datetime.now(MARKET_TZ) if now is None else now.astimezone(MARKET_TZ)
+    today = now.date()
+
+    if is_session(today) and now >= _refresh_time(today):
+        return today
+    return previous_session(today)
+
+
+def next_refresh(now=None):
+    """ Fn to get the time the next session's closes become final
+        Return: tz-aware datetime
+    """
+    return _refresh_time(next_session(last_completed_session(now)))
+
+
+def seconds_until_refresh(now=None):
+    """ Fn to get the seconds left until the next refresh is due """
+    now = datetime.now(MARKET_TZ) if now is None else now
+    return max((next_refresh(now) - now).total_seconds(), 0)
+
+
+if __name__ == '__main__':
+    write_sessions_file()
+    print('wrote {} sessions to {}'.format(len(load_sessions()), SESSIONS_FILE))